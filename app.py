@@ -23,18 +23,33 @@
 """
 
 import streamlit as st
+import asyncio
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import feedparser
 from datetime import datetime, timedelta
 import time
 import re
 import math
+import json
+import uuid
+import random
+import threading
+import os
+import sqlite3
+import functools
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import NamedTuple
+from types import MappingProxyType
 from io import StringIO
+from urllib.parse import urlparse
 
 # -----------------------------------------------------------------------------
 # 라이브러리 임포트 (예외 처리)
@@ -51,25 +66,18 @@ try:
 except ImportError:
     YFINANCE_AVAILABLE = False
 
-try:
-    from ta.momentum import RSIIndicator
-    from ta.trend import SMAIndicator, MACD
-    TA_AVAILABLE = True
-except ImportError:
-    TA_AVAILABLE = False
-
-try:
-    from fredapi import Fred
-    FRED_AVAILABLE = True
-except ImportError:
-    FRED_AVAILABLE = False
-
 try:
     import google.generativeai as genai
     GENAI_AVAILABLE = True
 except ImportError:
     GENAI_AVAILABLE = False
 
+try:
+    import websocket  # websocket-client
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    WEBSOCKET_AVAILABLE = False
+
 try:
     import firebase_admin
     from firebase_admin import credentials, firestore
@@ -204,6 +212,8 @@ if 'username' not in st.session_state:
     st.session_state.username = ""
 if 'is_logged_in' not in st.session_state:
     st.session_state.is_logged_in = False
+if 'session_id' not in st.session_state:  # [V8.4] 공용 스트림에서 세션 구분 (비로그인 세션끼리도 겹치지 않게)
+    st.session_state.session_id = uuid.uuid4().hex
 
 # [V7.9] API 키 세션 상태 초기화
 if 'gemini_key' not in st.session_state:
@@ -216,9 +226,486 @@ if 'grok_key' not in st.session_state:
     st.session_state.grok_key = ""
 if 'groq_key' not in st.session_state:  # [V8.0] Groq 오픈소스 모델용
     st.session_state.groq_key = ""
+if 'fred_key' not in st.session_state:  # [V8.4] FRED 매크로 지표용
+    st.session_state.fred_key = ""
 if 'telegram_id' not in st.session_state:
     st.session_state.telegram_id = ""
 
+# -----------------------------------------------------------------------------
+# [V8.4] 로컬 데이터 디렉터리 (캔들 / 가격 이력 / 코인 인덱스 / 매크로 저장소 공용)
+# -----------------------------------------------------------------------------
+DATA_DIR = os.environ.get("CRYPTO_INSIGHT_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data"))
+
+# -----------------------------------------------------------------------------
+# [V8.4] 공용 HTTP 세션 (커넥션 풀 + keep-alive + 재시도)
+# -----------------------------------------------------------------------------
+HTTP_USER_AGENT = "CryptoInsight/8.4 (+https://github.com/BrightSkyFREE/crypco-eco-free)"
+HTTP_POOL_CONNECTIONS = 32   # 풀을 유지할 호스트 수
+HTTP_POOL_MAXSIZE = 16       # 호스트별 유지 연결 수 (AI 위원회 6개 병렬 호출 + 여유)
+
+class _JitteredRetry(Retry):
+    """지수 백오프에 무작위 지연(jitter)을 더해 여러 세션의 재시도가 한꺼번에 몰리지 않도록 함"""
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return backoff + random.uniform(0, backoff) if backoff > 0 else 0
+
+@st.cache_resource
+def get_http_session():
+    """프로세스 공용 HTTP 세션 (모든 사용자 세션과 스레드가 같은 커넥션 풀을 재사용)"""
+    retry = _JitteredRetry(
+        total=2,
+        read=0,  # 응답 대기 타임아웃은 재시도하지 않음 → 죽은 호스트는 타임아웃 1번만 지불 (연결 실패/5xx만 재시도)
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 503, 504),  # 429는 재시도해도 악화되므로 제외
+        allowed_methods=frozenset({"GET"}),      # 멱등 요청만 재시도
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": HTTP_USER_AGENT, "Connection": "keep-alive"})
+    return session
+
+# -----------------------------------------------------------------------------
+# [V8.4] 호스트별 요청 스케줄러 (토큰 버킷 + 우선순위)
+# -----------------------------------------------------------------------------
+PRIORITY_INTERACTIVE = 0  # 화면에 바로 보이는 시세 조회
+PRIORITY_BACKGROUND = 1   # 코인 상세/설명/지수 등 늦어도 되는 조회
+
+# 호스트: (초당 토큰 보충량, 버킷 크기) - secrets.toml의 [rate_limits] 항목으로 덮어쓰기 가능
+#   예) [rate_limits]
+#       "api.coingecko.com" = [0.2, 3]
+HOST_RATE_LIMITS = {
+    "api.coingecko.com": (0.4, 5),   # 무료 플랜 분당 ~30회 → 여유를 두고 분당 24회
+    "api.upbit.com": (8, 10),        # 시세 조회 초당 10회
+    "api.alternative.me": (1, 5),
+    "api.bithumb.com": (10, 15),
+    "api.korbit.co.kr": (5, 10),
+}
+RATE_LIMIT_MAX_WAIT = {PRIORITY_INTERACTIVE: 2, PRIORITY_BACKGROUND: 8}  # 토큰 대기 기본 한도(초)
+BACKGROUND_RESERVE = 0.3  # 버킷의 30%는 대화형 요청 몫으로 남겨둠
+RATE_LIMIT_COOLDOWN = 30  # 429 응답에 Retry-After가 없을 때 쉬는 시간(초)
+
+class ThrottledError(Exception):
+    """요청 한도 초과 (대기 한도 안에 토큰을 얻지 못했거나 429 이후 쿨다운 중)"""
+
+class CircuitOpenError(ThrottledError):
+    """업스트림 장애로 차단기가 열려 있어 요청하지 않음 (호출자는 바로 대체 경로 사용)"""
+
+class _TokenBucket:
+    """호스트 1개의 요청 한도
+    - 백그라운드 요청은 예약분을 남겨야 하고, 대화형 요청이 기다리는 동안에는 양보
+    - 429를 받으면 쿨다운이 끝날 때까지 모든 요청을 멈춤
+    """
+    def __init__(self, host, rate, capacity):
+        self.host = host
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiting = {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 0}
+        self.cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _wait_time(self, priority, now):
+        """지금 토큰을 가져갈 수 있으면 0, 아니면 예상 대기 시간(초)"""
+        floor = 0.0
+        if priority != PRIORITY_INTERACTIVE:
+            floor = self.capacity * BACKGROUND_RESERVE + self.waiting[PRIORITY_INTERACTIVE]
+        need = max(0.0, 1 + floor - self.tokens) / self.rate
+        return max(need, self.blocked_until - now, 0.0)
+
+    def acquire(self, priority, max_wait):
+        deadline = time.monotonic() + max_wait
+        with self.cond:
+            self.waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_time(priority, now)
+                    if wait <= 0:
+                        self.tokens -= 1
+                        return
+                    if now + wait > deadline:
+                        raise ThrottledError(f"{self.host}: 요청 한도 초과 ({wait:.1f}초 후 가능)")
+                    self.cond.wait(wait)
+            finally:
+                self.waiting[priority] -= 1
+                self.cond.notify_all()
+
+    def penalize(self, seconds):
+        with self.cond:
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+@st.cache_resource
+def _get_rate_limiter():
+    """프로세스 공용 버킷 저장소 {'lock': 생성용 잠금, 'buckets': {호스트: _TokenBucket}}"""
+    return {'lock': threading.Lock(), 'buckets': {}}
+
+def _host_rate_limit(host):
+    try:
+        custom = st.secrets.get("rate_limits", {})
+        if host in custom:
+            rate, capacity = custom[host]
+            return float(rate), float(capacity)
+    except: pass
+    return HOST_RATE_LIMITS.get(host)
+
+def _bucket_for(host):
+    """호스트의 버킷 (한도가 설정되지 않은 호스트는 None)"""
+    limiter = _get_rate_limiter()
+    with limiter['lock']:
+        if host not in limiter['buckets']:
+            limit = _host_rate_limit(host)
+            limiter['buckets'][host] = _TokenBucket(host, *limit) if limit else None
+        return limiter['buckets'][host]
+
+def http_get(url, priority=PRIORITY_INTERACTIVE, max_wait=None, **kwargs):
+    """공용 세션 GET (기본 timeout 5초, 5xx/연결 오류 시 백오프 재시도)
+    - 한도가 설정된 호스트는 토큰을 얻은 뒤에만 요청 (대화형 요청 우선)
+    - max_wait: 토큰 대기 한도(초), 0이면 기다리지 않고 바로 ThrottledError
+    - 429 응답은 그대로 반환하되 해당 호스트를 Retry-After 동안 쉬게 함
+    - 차단기가 열린 호스트는 요청하지 않고 바로 CircuitOpenError
+    """
+    kwargs.setdefault("timeout", 5)
+    host = urlparse(url).hostname or ""
+    breaker = get_breaker(HOST_BREAKERS[host]) if host in HOST_BREAKERS else None
+    if breaker and not breaker.allow():
+        raise CircuitOpenError(f"{breaker.name}: 장애로 차단 중")
+    bucket = _bucket_for(host)
+    if bucket:
+        bucket.acquire(priority, RATE_LIMIT_MAX_WAIT[priority] if max_wait is None else max_wait)
+    try:
+        res = get_http_session().get(url, **kwargs)
+    except requests.RequestException:
+        if breaker: breaker.record_failure()
+        raise
+    if breaker:
+        breaker.record_failure() if res.status_code >= 500 else breaker.record_success()
+    if bucket and res.status_code == 429:
+        try:
+            cooldown = float(res.headers.get("Retry-After", RATE_LIMIT_COOLDOWN))
+        except ValueError:
+            cooldown = RATE_LIMIT_COOLDOWN
+        bucket.penalize(cooldown)
+    return res
+
+def http_post(url, **kwargs):
+    """공용 세션 POST (응답 오류는 재시도하지 않음)"""
+    kwargs.setdefault("timeout", 5)
+    return get_http_session().post(url, **kwargs)
+
+# -----------------------------------------------------------------------------
+# [V8.4] ccxt 거래소 클라이언트 레지스트리 (프로세스당 거래소별 1개)
+# -----------------------------------------------------------------------------
+@st.cache_resource
+def _get_ccxt_registry():
+    """{'lock': 생성용 잠금, 'clients': {거래소ID: 인스턴스}, 'market_locks': {거래소ID: 마켓 로드 잠금}}"""
+    return {'lock': threading.Lock(), 'clients': {}, 'market_locks': {}}
+
+def get_exchange(exchange_id):
+    """ccxt 거래소 클라이언트 반환 (모든 세션/스레드 공유)
+    - 최초 1회만 생성하여 enableRateLimit 상태를 유지
+    - 마켓 메타데이터는 첫 사용 시 1회만 로드 (실패 시 다음 호출에서 재시도)
+    """
+    if not CCXT_AVAILABLE:
+        return None
+    registry = _get_ccxt_registry()
+    with registry['lock']:
+        ex = registry['clients'].get(exchange_id)
+        if ex is None:
+            ex = getattr(ccxt, exchange_id)({'timeout': 10000, 'enableRateLimit': True})
+            registry['clients'][exchange_id] = ex
+            registry['market_locks'][exchange_id] = threading.Lock()
+        market_lock = registry['market_locks'][exchange_id]
+    if not ex.markets:
+        with market_lock:
+            if not ex.markets:
+                ex.load_markets()
+    return ex
+
+# -----------------------------------------------------------------------------
+# [V8.4] 비동기 동시 수집 (작업별 마감 시간 적용)
+# -----------------------------------------------------------------------------
+@st.cache_resource
+def _get_fetch_executor():
+    """동시 수집용 공용 스레드 풀
+    asyncio 기본 executor는 asyncio.run() 종료 시 모든 작업을 기다리므로 별도 풀을 사용
+    (마감 시간을 넘긴 작업은 뒤에서 계속 실행되어 캐시만 채우고, 화면은 기다리지 않음)
+    """
+    return ThreadPoolExecutor(max_workers=16, thread_name_prefix="fetch")
+
+async def _run_with_deadline(fn, args, deadline, default):
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(_get_fetch_executor(), lambda: fn(*args)), deadline)
+    except Exception:
+        return default
+
+async def _gather_with_deadlines(jobs):
+    names = list(jobs)
+    results = await asyncio.gather(*(_run_with_deadline(*jobs[name]) for name in names))
+    return dict(zip(names, results))
+
+def fetch_concurrently(jobs):
+    """독립적인 조회 작업을 한꺼번에 시작해 가장 느린 작업 하나만큼만 기다림
+    jobs: {이름: (함수, 인자 튜플, 마감 시간(초), 실패/초과 시 기본값)}
+    Returns: {이름: 결과 또는 기본값}
+    """
+    if not jobs:
+        return {}
+    return asyncio.run(_gather_with_deadlines(jobs))
+
+# -----------------------------------------------------------------------------
+# [V8.4] 업스트림별 회로 차단기 (장애 시 타임아웃 없이 바로 대체 경로로)
+# -----------------------------------------------------------------------------
+BREAKER_FAILURE_THRESHOLD = 3  # 연속 실패 횟수 → open
+BREAKER_RESET_TIMEOUT = 30     # open 후 복구 확인(probe)까지 대기(초)
+HOST_BREAKERS = {"api.coingecko.com": "coingecko"}  # http_get이 자동으로 적용하는 호스트
+
+class CircuitBreaker:
+    """업스트림 1곳의 회로 차단기
+    - closed: 정상 호출, 연속 실패가 임계값에 도달하면 open
+    - open: 호출하지 않고 바로 CircuitOpenError → 장애 중에는 타임아웃 1번만 지불
+    - half-open: reset_timeout이 지나면 백그라운드에서 가벼운 요청(probe)으로 복구 확인
+      (probe가 없는 업스트림은 다음 실제 호출 1번을 시험 호출로 허용)
+    - 네트워크 오류만 실패로 집계, 빈 응답처럼 원인을 알 수 없는 오류는 probe가 실패할 때만 집계
+    """
+    def __init__(self, name, threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.checking = False
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.probing else "open"
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            probe = BREAKER_PROBES.get(self.name)
+            if probe is None:
+                self.opened_at = None
+                self.failures = self.threshold - 1  # 시험 호출이 실패하면 바로 다시 open
+                return True
+            self.probing = True
+        _get_fetch_executor().submit(self._probe, probe)
+        return False
+
+    def _probe(self, probe):
+        try:
+            ok = bool(probe())
+        except Exception:
+            ok = False
+        with self.lock:
+            self.probing = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.opened_at = time.monotonic()
+
+    def check_health(self):
+        """요청 결과만으로 장애인지 알 수 없을 때 백그라운드 probe로 확인 (reset_timeout마다 최대 1번)"""
+        probe = BREAKER_PROBES.get(self.name)
+        with self.lock:
+            if probe is None or self.checking or self.opened_at is not None:
+                return
+            if self.checked_at is not None and time.monotonic() - self.checked_at < self.reset_timeout:
+                return
+            self.checking = True
+            self.checked_at = time.monotonic()
+        _get_fetch_executor().submit(self._check, probe)
+
+    def _check(self, probe):
+        try:
+            ok = bool(probe())
+        except Exception:
+            ok = False
+        with self.lock:
+            self.checking = False
+            if ok:
+                return
+            self.checked_at = None  # 장애가 이어지면 다음 애매한 오류도 바로 확인
+        self.record_failure()
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    def call(self, fn, *args, **kwargs):
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name}: 장애로 차단 중")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if _is_outage(e):
+                self.record_failure()
+            elif not _is_request_error(e):
+                self.check_health()
+            raise
+        self.record_success()
+        return result
+
+class NoDataError(Exception):
+    """업스트림은 응답했지만 요청한 데이터가 없음 (없는 심볼 등) - 차단기 실패로 집계하지 않음"""
+    pass
+
+def _is_outage(exc):
+    """네트워크 오류만 장애로 집계 (ccxt는 NetworkError만 - 없는 심볼 등 요청 오류는 제외)"""
+    if CCXT_AVAILABLE and isinstance(exc, ccxt.BaseError):
+        return isinstance(exc, ccxt.NetworkError)
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError))
+
+def _is_request_error(exc):
+    """요청 자체가 잘못된 오류 (장애 여부를 확인할 필요도 없음)"""
+    return CCXT_AVAILABLE and isinstance(exc, ccxt.BaseError)
+
+@st.cache_resource
+def _get_breakers():
+    """프로세스 공용 차단기 저장소 {'lock': 생성용 잠금, 'breakers': {이름: CircuitBreaker}}"""
+    return {'lock': threading.Lock(), 'breakers': {}}
+
+def get_breaker(name):
+    registry = _get_breakers()
+    with registry['lock']:
+        if name not in registry['breakers']:
+            registry['breakers'][name] = CircuitBreaker(name)
+        return registry['breakers'][name]
+
+def guarded_call(name, fn, *args, **kwargs):
+    """fn을 name 차단기로 감싸 호출 (open 상태면 CircuitOpenError)"""
+    return get_breaker(name).call(fn, *args, **kwargs)
+
+def yf_download(*args, **kwargs):
+    """yf.download를 'yahoo' 차단기로 감쌈
+    yfinance는 네트워크 오류를 삼키고 빈 표를 반환 → 빈 결과는 NoDataError (없는 심볼이 대부분)
+    장애인지는 차단기가 probe로 따로 확인하므로 없는 심볼을 보유해도 차단기가 열리지 않음
+    """
+    def _download():
+        df = yf.download(*args, **kwargs)
+        if df is None or df.empty:
+            raise NoDataError(f"yfinance: 빈 응답 {args}")
+        return df
+    return guarded_call("yahoo", _download)
+
+def ccxt_call(exchange_id, method, *args):
+    """ccxt 거래소 메서드를 거래소별 차단기로 감싸 호출 (예: ccxt_call("okx", "fetch_ticker", "BTC/USDT"))"""
+    return guarded_call(exchange_id, lambda: getattr(get_exchange(exchange_id), method)(*args))
+
+# half-open 상태에서 백그라운드로 보내는 가벼운 복구 확인 요청
+BREAKER_PROBES = {
+    "coingecko": lambda: get_http_session().get("https://api.coingecko.com/api/v3/ping", timeout=5).status_code == 200,
+    "yahoo": lambda: not yf.Ticker("BTC-USD").history(period="5d").empty,
+    "okx": lambda: bool(get_exchange("okx").fetch_time()),
+}
+
+# -----------------------------------------------------------------------------
+# [V8.4] stale-while-revalidate 캐시 (만료된 값은 즉시 반환 + 백그라운드 갱신)
+# -----------------------------------------------------------------------------
+@st.cache_resource
+def _get_swr_store():
+    """프로세스 공용 SWR 캐시 {'lock', 'entries': {키: (값, 저장시각)}, 'refreshing': {갱신 중인 키}, 'key_locks': {키: 첫 조회 잠금}}"""
+    return {'lock': threading.Lock(), 'entries': {}, 'refreshing': set(), 'key_locks': {}}
+
+def _swr_copy(value):
+    """호출자가 결과를 수정해도 캐시가 오염되지 않도록 복사본 반환"""
+    if isinstance(value, tuple):
+        return tuple(_swr_copy(v) for v in value)
+    return value.copy() if hasattr(value, 'copy') else value
+
+def swr_cache(ttl, is_failure=lambda value: value is None):
+    """stale-while-revalidate 캐시 데코레이터 (st.cache_data 대체용)
+    - TTL 이내: 캐시된 값 반환
+    - TTL 경과: 마지막 정상 값을 즉시 반환하고 백그라운드에서 갱신 (실패하면 기존 값 유지)
+    - 값이 아예 없을 때만 호출자가 조회를 기다림
+    is_failure: 결과가 실패 시 기본값인지 판별 → 실패 결과는 저장하지 않음
+    화면에서 만료 여부는 함수.status(인자...) 또는 show_stale_notice로 확인
+    """
+    def decorator(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        def _key(args, kwargs):
+            return (name, repr(args), repr(sorted(kwargs.items())))
+
+        def _refresh(key, args, kwargs):
+            store = _get_swr_store()
+            try:
+                value = fn(*args, **kwargs)
+                if not is_failure(value):
+                    with store['lock']:
+                        store['entries'][key] = (value, time.time())
+                return value
+            finally:
+                with store['lock']:
+                    store['refreshing'].discard(key)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            store = _get_swr_store()
+            key = _key(args, kwargs)
+            with store['lock']:
+                hit = store['entries'].get(key)
+                if hit and time.time() - hit[1] > ttl and key not in store['refreshing']:
+                    store['refreshing'].add(key)
+                    _get_fetch_executor().submit(_refresh, key, args, kwargs)
+                key_lock = store['key_locks'].setdefault(key, threading.Lock())
+            if hit:
+                return _swr_copy(hit[0])
+
+            # 첫 조회: 같은 키로 동시에 들어온 호출은 먼저 온 조회 결과를 함께 사용
+            with key_lock:
+                with store['lock']:
+                    hit = store['entries'].get(key)
+                    if not hit:
+                        store['refreshing'].add(key)
+                if hit:
+                    return _swr_copy(hit[0])
+                return _swr_copy(_refresh(key, args, kwargs))
+
+        def status(*args, **kwargs):
+            """(마지막 정상 값의 경과 시간(초) 또는 None, TTL 경과 여부)"""
+            hit = _get_swr_store()['entries'].get(_key(args, kwargs))
+            if not hit:
+                return None, False
+            age = time.time() - hit[1]
+            return age, age > ttl
+
+        wrapper.status = status
+        return wrapper
+    return decorator
+
+def show_stale_notice(fn, *args, **kwargs):
+    """swr_cache 함수의 값이 TTL을 넘겼으면 화면에 '이전 데이터' 표시"""
+    age, stale = fn.status(*args, **kwargs)
+    if stale:
+        st.caption(f"⏳ {int(age // 60)}분 전 데이터입니다 (백그라운드에서 갱신 중)")
+
 # -----------------------------------------------------------------------------
 # [V7.5] Firebase 연동 함수
 # -----------------------------------------------------------------------------
@@ -340,7 +827,7 @@ def ask_gemini(api_key, prompt, system_prompt="You are a helpful assistant. Answ
     available_models = []
     try:
         list_url = f"https://generativelanguage.googleapis.com/v1beta/models?key={api_key}"
-        list_res = requests.get(list_url, timeout=10)
+        list_res = http_get(list_url, timeout=10)
         
         if list_res.status_code == 200:
             models_data = list_res.json().get('models', [])
@@ -394,7 +881,7 @@ def ask_gemini(api_key, prompt, system_prompt="You are a helpful assistant. Answ
                 }
             }
             
-            res = requests.post(url, headers=headers, json=data, timeout=30)
+            res = http_post(url, headers=headers, json=data, timeout=30)
             
             if res.status_code == 200:
                 result = res.json()
@@ -428,7 +915,7 @@ def ask_chatgpt(api_key, prompt):
             ],
             "temperature": 0.5
         }
-        res = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=data, timeout=20)
+        res = http_post("https://api.openai.com/v1/chat/completions", headers=headers, json=data, timeout=20)
         return res.json()['choices'][0]['message']['content'] if res.status_code == 200 else f"오류: {res.text}"
     except Exception as e: 
         return f"연결 실패: {e}"
@@ -445,7 +932,7 @@ def ask_claude(api_key, prompt):
             "messages": [{"role": "user", "content": prompt}],
             "system": "당신은 온체인 데이터와 기술적 지표를 전문으로 하는 데이터 분석가입니다. 숫자와 차트 패턴을 기반으로 객관적이고 냉철하게 분석합니다. 한국어로 답변하세요."
         }
-        res = requests.post("https://api.anthropic.com/v1/messages", headers=headers, json=data, timeout=20)
+        res = http_post("https://api.anthropic.com/v1/messages", headers=headers, json=data, timeout=20)
         return res.json()['content'][0]['text'] if res.status_code == 200 else f"오류: {res.text}"
     except Exception as e: 
         return f"연결 실패: {e}"
@@ -464,7 +951,7 @@ def ask_grok(api_key, prompt):
             ],
             "stream": False
         }
-        res = requests.post("https://api.x.ai/v1/chat/completions", headers=headers, json=data, timeout=20)
+        res = http_post("https://api.x.ai/v1/chat/completions", headers=headers, json=data, timeout=20)
         
         if res.status_code == 200:
             return res.json()['choices'][0]['message']['content']
@@ -499,7 +986,7 @@ def ask_groq(api_key, prompt, model_key="GROQ_LLAMA", system_prompt="You are a h
             "temperature": 0.7,
             "max_tokens": 1000
         }
-        res = requests.post(
+        res = http_post(
             "https://api.groq.com/openai/v1/chat/completions", 
             headers=headers, 
             json=data, 
@@ -631,49 +1118,22 @@ def generate_sell_calendar(score, current_qty):
 # =============================================================================
 # [V8.3 ENGINE 3] 통합 시장 데이터 수집 (Sell Score용)
 # =============================================================================
-@st.cache_data(ttl=300)
 def get_market_data_v83():
-    """시장 데이터 조회 (오류 시 기본값 반환)"""
-    data = {'btc_price': 0, 'dom': 50, 'fng': 50, 'dxy_chg': 0}
-    try:
-        # 1. CoinGecko (Dominance)
-        cg_res = requests.get("https://api.coingecko.com/api/v3/global", timeout=5).json()
-        data['dom'] = cg_res['data']['market_cap_percentage']['btc']
-        
-        # 2. Alternative.me (FnG)
-        fng_res = requests.get("https://api.alternative.me/fng/?limit=1", timeout=5).json()
-        data['fng'] = int(fng_res['data'][0]['value'])
-        
-        # 3. Yfinance (DXY)
-        if YFINANCE_AVAILABLE:
-            dxy = yf.Ticker("DX-Y.NYB").history(period="5d")
-            if len(dxy) >= 2:
-                # MultiIndex 처리
-                close_col = dxy['Close']
-                if hasattr(close_col, 'iloc'):
-                    curr_val = float(close_col.iloc[-1]) if len(close_col.shape) == 1 else float(close_col.iloc[-1, 0])
-                    prev_val = float(close_col.iloc[-2]) if len(close_col.shape) == 1 else float(close_col.iloc[-2, 0])
-                    data['dxy_chg'] = (curr_val - prev_val) / prev_val * 100
-    except:
-        pass # API 오류 시 기본값 유지
-    return data
+    """Sell Score 입력 데이터 (글로벌 시장 프로바이더 뷰에서 조합, 오류 시 기본값)"""
+    dom = get_dominance_view()
+    return {
+        'btc_price': 0,
+        'dom': dom.btc if dom.btc > 0 else 50,
+        'fng': get_fng_view().value,
+        'dxy_chg': get_dxy_view().change_pct
+    }
 
-@st.cache_data(ttl=3600)
 def get_btc_ohlcv_weekly():
-    """BTC 주봉 데이터 (RSI 계산용)"""
-    if YFINANCE_AVAILABLE:
-        try:
-            df = yf.download("BTC-USD", period="2y", interval="1wk", progress=False)
-            if not df.empty:
-                # MultiIndex 컬럼 처리
-                if isinstance(df.columns, pd.MultiIndex):
-                    return pd.DataFrame({
-                        'Close': df['Close'].iloc[:, 0] if len(df['Close'].shape) > 1 else df['Close']
-                    })
-                return df[['Close']]
-        except: 
-            pass
-    return None
+    """BTC 주봉 데이터 (RSI 계산용, 2년) - 일봉 저장소에서 리샘플링"""
+    df = get_weekly_ohlcv("BTC", 104)
+    if df is None or df.empty:
+        return None
+    return pd.DataFrame({'Close': df['c']})
 
 def get_current_mvrv():
     """
@@ -687,96 +1147,446 @@ def get_current_mvrv():
 # -----------------------------------------------------------------------------
 # 데이터 함수 (API)
 # -----------------------------------------------------------------------------
-@st.cache_data(ttl=300)
-def get_usd_krw_rate():
-    try:
-        if YFINANCE_AVAILABLE:
-            hist = yf.Ticker("KRW=X").history(period="1d")
-            if not hist.empty: return float(hist['Close'].iloc[-1])
-    except: pass
-    return 1450.0
+# -----------------------------------------------------------------------------
+# [V8.4] 환율 엔진 (여러 출처 + 백그라운드 갱신 + 장중 이력)
+# -----------------------------------------------------------------------------
+FX_REFRESH_INTERVAL = 60    # 갱신 주기(초)
+FX_STALE_AFTER = 900        # 이보다 오래된 출처 값은 기준 환율로 쓰지 않음(초)
+FX_HISTORY_SIZE = 1440      # 장중 이력 보관 개수 (1분 간격 ≈ 24시간)
+FX_FALLBACK_RATE = 1450.0   # 모든 출처가 한 번도 응답하지 않았을 때만 사용
+
+class FxQuote(NamedTuple):
+    rate: float           # 기준 원/달러 환율
+    source: str           # 'yahoo' | 'upbit-usdt' | 'fallback'
+    updated_at: float     # 기준 환율을 받은 시각 (epoch)
+    usdt_krw: float       # 업비트 USDT 원화 가격 (없으면 0)
+    usdt_premium: float   # USDT 내재 환율 vs 기준 환율 괴리율% (테더 프리미엄)
+
+    @property
+    def age(self):
+        return time.time() - self.updated_at if self.updated_at else math.inf
+
+def _fetch_yahoo_fx():
+    """Yahoo KRW=X 최신가 (fast_info는 표 전체 대신 값 하나만 받음)"""
+    price = guarded_call("yahoo", lambda: yf.Ticker("KRW=X").fast_info.last_price)
+    return float(price) if price and price > 0 else None
+
+def _fetch_usdt_krw():
+    """업비트 KRW-USDT 가격 = 크립토 시장의 내재 환율"""
+    quote = fetch_upbit_quotes(["USDT"]).get("USDT")
+    return quote[0] if quote else None
+
+class FxService:
+    """원/달러 환율 서비스 (모든 세션 공유)
+    - 백그라운드 스레드가 Yahoo와 업비트 USDT를 동시에 조회해 출처별 최신값과 장중 이력을 유지
+    - 기준 환율: 최신 Yahoo 값 → (Yahoo가 오래되면) USDT 내재 환율 → 마지막으로 받은 값 → 고정값
+    - 조회는 메모리 읽기뿐이라 어느 탭에서 불러도 블로킹 없음
+    """
+    def __init__(self, interval=FX_REFRESH_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._latest = {}    # {출처: (환율, 받은 시각)}
+        self._history = deque(maxlen=FX_HISTORY_SIZE)  # (시각, Yahoo 환율, USDT 환율)
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="fx-service", daemon=True)
+        self._thread.start()
+
+    def refresh(self):
+        jobs = {'yahoo': (_fetch_yahoo_fx, (), 8, None)}
+        jobs['upbit-usdt'] = (_fetch_usdt_krw, (), 5, None)
+        results = fetch_concurrently(jobs)
+        now = time.time()
+        with self._lock:
+            for source, rate in results.items():
+                if rate:
+                    self._latest[source] = (rate, now)
+            self._history.append((now, results['yahoo'], results['upbit-usdt']))
+        self._ready.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"환율 갱신 실패: {e}")
+            time.sleep(self.interval)
+
+    def quote(self, wait=5):
+        """현재 기준 환율 (첫 갱신 전이면 최대 wait초 대기)"""
+        self._ready.wait(wait)
+        now = time.time()
+        with self._lock:
+            latest = dict(self._latest)
+        yahoo = latest.get('yahoo')
+        usdt = latest.get('upbit-usdt')
+        if yahoo and now - yahoo[1] <= FX_STALE_AFTER:
+            rate, source, updated = yahoo[0], 'yahoo', yahoo[1]
+        elif usdt and now - usdt[1] <= FX_STALE_AFTER:
+            rate, source, updated = usdt[0], 'upbit-usdt', usdt[1]
+        elif yahoo or usdt:
+            rate, updated = max((v for v in (yahoo, usdt) if v), key=lambda v: v[1])
+            source = 'yahoo' if yahoo and yahoo[1] == updated else 'upbit-usdt'
+        else:
+            rate, source, updated = FX_FALLBACK_RATE, 'fallback', 0.0
+        usdt_krw = usdt[0] if usdt else 0.0
+        base = yahoo[0] if yahoo else 0.0
+        premium = (usdt_krw / base - 1) * 100 if usdt_krw and base else 0.0
+        return FxQuote(rate, source, updated, usdt_krw, premium)
+
+    def history(self):
+        """장중 이력 표 (index=시각, 컬럼 yahoo / upbit_usdt)"""
+        with self._lock:
+            rows = list(self._history)
+        df = pd.DataFrame(rows, columns=['ts', 'yahoo', 'upbit_usdt'])
+        df['ts'] = pd.to_datetime(df['ts'], unit='s')
+        return df.set_index('ts')
+
+@st.cache_resource
+def get_fx_service():
+    return FxService()
+
+def get_fx_quote():
+    return get_fx_service().quote()
 
 # -----------------------------------------------------------------------------
 # [V8.1] 시장 심리 지표 API 함수들
 # -----------------------------------------------------------------------------
+# -----------------------------------------------------------------------------
+# [V8.4] 글로벌 시장 프로바이더 (업스트림별로 TTL당 1회 조회 → 용도별 타입 뷰 제공)
+# -----------------------------------------------------------------------------
+class DominanceView(NamedTuple):
+    btc: float
+    eth: float
+
+class MarketCapView(NamedTuple):
+    total_market_cap: float
+    total_volume: float
+    change_24h: float
+    active_cryptocurrencies: int
+
+class FngView(NamedTuple):
+    value: int
+    classification: str
+    timestamp: str
+    update: str
+    history: tuple   # ((datetime, 값), ...) 오래된 순
+
+class DxyView(NamedTuple):
+    value: float
+    change_pct: float
+
 @st.cache_data(ttl=600)  # 10분 캐시
-def get_fear_greed_index():
-    """Alternative.me API에서 공포탐욕지수 조회"""
+def fetch_coingecko_global():
+    """CoinGecko /global 원본 데이터 (실패 시 None)"""
     try:
-        url = "https://api.alternative.me/fng/?limit=1"
-        res = requests.get(url, timeout=5)
+        res = http_get("https://api.coingecko.com/api/v3/global", timeout=5)
         if res.status_code == 200:
-            data = res.json()['data'][0]
-            return {
-                'value': int(data['value']),
-                'classification': data['value_classification'],
-                'timestamp': data['timestamp'],
-                'update': data.get('time_until_update', '')
-            }
-    except:
-        pass
-    return {'value': 50, 'classification': 'Neutral', 'timestamp': '', 'update': ''}
+            return res.json()['data']
+    except: pass
+    return None
 
 @st.cache_data(ttl=600)  # 10분 캐시
-def get_btc_dominance():
-    """CoinGecko API에서 BTC 도미넌스 조회"""
+def fetch_fng_history(limit=30):
+    """Alternative.me 공포탐욕지수 최근 limit일 원본 (최신순, 실패 시 [])"""
     try:
-        url = "https://api.coingecko.com/api/v3/global"
-        res = requests.get(url, timeout=5)
+        res = http_get(f"https://api.alternative.me/fng/?limit={limit}", timeout=5)
         if res.status_code == 200:
-            data = res.json()['data']
-            return {
-                'btc_dominance': data['market_cap_percentage']['btc'],
-                'eth_dominance': data['market_cap_percentage'].get('eth', 0),
-                'total_market_cap': data['total_market_cap']['usd'],
-                'total_volume': data['total_volume']['usd'],
-                'market_cap_change_24h': data['market_cap_change_percentage_24h_usd'],
-                'active_cryptocurrencies': data['active_cryptocurrencies']
-            }
-    except:
-        pass
+            return res.json()['data']
+    except: pass
+    return []
+
+@st.cache_data(ttl=300)
+def fetch_dxy_closes():
+    """달러 인덱스 최근 5일 종가 목록 (실패 시 [])"""
+    try:
+        if YFINANCE_AVAILABLE:
+            hist = yf.Ticker("DX-Y.NYB").history(period="5d")
+            return [float(v) for v in hist['Close'].dropna()]
+    except: pass
+    return []
+
+def get_dominance_view():
+    data = fetch_coingecko_global() or {}
+    pct = data.get('market_cap_percentage', {})
+    return DominanceView(btc=pct.get('btc', 0), eth=pct.get('eth', 0))
+
+def get_market_cap_view():
+    data = fetch_coingecko_global() or {}
+    return MarketCapView(
+        total_market_cap=data.get('total_market_cap', {}).get('usd', 0),
+        total_volume=data.get('total_volume', {}).get('usd', 0),
+        change_24h=data.get('market_cap_change_percentage_24h_usd', 0),
+        active_cryptocurrencies=data.get('active_cryptocurrencies', 0)
+    )
+
+def get_fng_view():
+    rows = fetch_fng_history()
+    if not rows:
+        return FngView(value=50, classification='Neutral', timestamp='', update='', history=())
+    latest = rows[0]
+    history = tuple((datetime.fromtimestamp(int(r['timestamp'])), int(r['value'])) for r in reversed(rows))
+    return FngView(
+        value=int(latest['value']),
+        classification=latest['value_classification'],
+        timestamp=latest['timestamp'],
+        update=latest.get('time_until_update', ''),
+        history=history
+    )
+
+def get_dxy_view():
+    closes = fetch_dxy_closes()
+    if len(closes) >= 2:
+        return DxyView(value=closes[-1], change_pct=(closes[-1] - closes[-2]) / closes[-2] * 100)
+    return DxyView(value=104.5, change_pct=0.0)
+
+def get_fear_greed_index():
+    """공포탐욕지수 (대시보드용 dict 뷰)"""
+    fng = get_fng_view()
+    return {'value': fng.value, 'classification': fng.classification, 'timestamp': fng.timestamp, 'update': fng.update}
+
+def get_btc_dominance():
+    """BTC 도미넌스 + 전체 시장 (대시보드용 dict 뷰)"""
+    dom, cap = get_dominance_view(), get_market_cap_view()
     return {
-        'btc_dominance': 0, 'eth_dominance': 0, 
-        'total_market_cap': 0, 'total_volume': 0,
-        'market_cap_change_24h': 0, 'active_cryptocurrencies': 0
+        'btc_dominance': dom.btc,
+        'eth_dominance': dom.eth,
+        'total_market_cap': cap.total_market_cap,
+        'total_volume': cap.total_volume,
+        'market_cap_change_24h': cap.change_24h,
+        'active_cryptocurrencies': cap.active_cryptocurrencies
     }
 
-@st.cache_data(ttl=600)
+# -----------------------------------------------------------------------------
+# [V8.4] FRED 매크로 지표 저장소 (로컬 SQLite + 새 관측치만 증분 수집)
+# -----------------------------------------------------------------------------
+# FRED REST 주소 (로컬 테스트 서버 등으로 바꿀 때 FRED_API_URL 환경변수 사용)
+FRED_API_URL = os.environ.get("FRED_API_URL", "https://api.stlouisfed.org/fred").rstrip("/")
+MACRO_DB_PATH = os.path.join(DATA_DIR, "macro.sqlite3")
+MACRO_REFRESH = 6 * 3600          # 시리즈별 재수집 간격(초) - 대부분 월간 지표
+MACRO_HISTORY_START = "2000-01-01"  # 처음 수집할 때의 시작일
+MACRO_RETRY = 600                 # 수집 실패 후 첫 재시도 대기(초) - 연속 실패 시 2배씩, 최대 MACRO_REFRESH
+# 화면 이름 → FRED 시리즈 ID (secrets.toml의 [fred_series]로 덮어쓰기 가능)
+# ISM 제조업 지수는 FRED에서 제공하지 않으므로 기본은 수동 입력값 (대체 시리즈가 있으면 "ism" 키로 지정)
+FRED_SERIES = {
+    "m2": "M2SL",
+    "fed_funds": "FEDFUNDS",
+    "cpi": "CPIAUCSL",
+}
+
+class MacroStore:
+    """FRED 시리즈 관측치 저장소 (모든 세션/스레드 공유)
+    - observations: (시리즈, 날짜) → 값 (같은 날짜는 덮어써 수정치 반영)
+    - fetched: 시리즈별 마지막 수집 시각 (재시작해도 MACRO_REFRESH 안에는 다시 받지 않음)
+    - failures: 시리즈별 연속 실패 횟수와 재시도 가능 시각 (잘못된 ID/키로 매 화면마다 요청하지 않음)
+    """
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS observations ("
+                " series_id TEXT, date TEXT, value REAL,"
+                " PRIMARY KEY (series_id, date)) WITHOUT ROWID"
+            )
+            self.conn.execute("CREATE TABLE IF NOT EXISTS fetched (series_id TEXT PRIMARY KEY, fetched_at REAL)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS failures (series_id TEXT PRIMARY KEY, count INTEGER, retry_at REAL)")
+
+    def last_date(self, series_id):
+        with self.lock:
+            return self.conn.execute("SELECT MAX(date) FROM observations WHERE series_id=?", (series_id,)).fetchone()[0]
+
+    def fetched_at(self, series_id):
+        with self.lock:
+            row = self.conn.execute("SELECT fetched_at FROM fetched WHERE series_id=?", (series_id,)).fetchone()
+        return row[0] if row else 0.0
+
+    def retry_at(self, series_id):
+        with self.lock:
+            row = self.conn.execute("SELECT retry_at FROM failures WHERE series_id=?", (series_id,)).fetchone()
+        return row[0] if row else 0.0
+
+    def record_failure(self, series_id):
+        """실패 기록 → MACRO_RETRY부터 연속 실패마다 2배씩 늘린 시각까지 재시도하지 않음"""
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT count FROM failures WHERE series_id=?", (series_id,)).fetchone()
+            count = (row[0] if row else 0) + 1
+            backoff = min(MACRO_RETRY * 2 ** (count - 1), MACRO_REFRESH)
+            self.conn.execute("INSERT OR REPLACE INTO failures VALUES (?,?,?)", (series_id, count, time.time() + backoff))
+
+    def upsert(self, series_id, observations):
+        """observations: [(날짜 'YYYY-MM-DD', 값)]"""
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO observations VALUES (?,?,?)",
+                                  [(series_id, d, v) for d, v in observations])
+            self.conn.execute("INSERT OR REPLACE INTO fetched VALUES (?,?)", (series_id, time.time()))
+            self.conn.execute("DELETE FROM failures WHERE series_id=?", (series_id,))
+
+    def series(self, series_id):
+        with self.lock:
+            rows = self.conn.execute("SELECT date, value FROM observations WHERE series_id=? ORDER BY date", (series_id,)).fetchall()
+        if not rows:
+            return pd.Series(dtype='float64', name=series_id)
+        dates, values = zip(*rows)
+        return pd.Series(values, index=pd.to_datetime(list(dates)), name=series_id, dtype='float64')
+
+@st.cache_resource
+def get_macro_store():
+    return MacroStore(MACRO_DB_PATH)
+
+def _fred_series_ids():
+    series = dict(FRED_SERIES)
+    try:
+        series.update(st.secrets.get("fred_series", {}))
+    except: pass
+    return series
+
+def fetch_fred_observations(api_key, series_id, start):
+    """FRED /series/observations (start 이후) → [(날짜, 값)] (결측치 '.'는 제외)"""
+    res = http_get(f"{FRED_API_URL}/series/observations", params={
+        'series_id': series_id, 'api_key': api_key, 'file_type': 'json', 'observation_start': start
+    }, timeout=10)
+    res.raise_for_status()
+    return [(o['date'], float(o['value'])) for o in res.json().get('observations', []) if o.get('value') not in (None, '.')]
+
+def _sync_fred_series(api_key, series_id):
+    store = get_macro_store()
+    # 마지막 관측일부터 다시 받아 수정치까지 반영
+    start = store.last_date(series_id) or MACRO_HISTORY_START
+    try:
+        observations = fetch_fred_observations(api_key, series_id, start)
+    except Exception:
+        store.record_failure(series_id)
+        raise
+    store.upsert(series_id, observations)
+    return True
+
+def sync_macro_series(api_key):
+    """오래된 시리즈만 동시에 증분 수집 (최근 MACRO_REFRESH 안에 받은 시리즈와 재시도 대기 중인 시리즈는 요청 없음)
+    api_key: 사용자가 입력한 FRED API 키 (없으면 수집하지 않고 저장된 값만 표시)
+    """
+    if not api_key:
+        return
+    store = get_macro_store()
+    now = time.time()
+    stale = [sid for sid in _fred_series_ids().values()
+             if now - store.fetched_at(sid) > MACRO_REFRESH and now >= store.retry_at(sid)]
+    fetch_concurrently({sid: (_sync_fred_series, (api_key, sid), 15, False) for sid in stale})
+
+def get_macro_series(name):
+    """로컬에 저장된 매크로 시리즈 (name: FRED_SERIES의 키) - 네트워크 요청 없음"""
+    series_id = _fred_series_ids().get(name)
+    return get_macro_store().series(series_id) if series_id else pd.Series(dtype='float64')
+
+# -----------------------------------------------------------------------------
+# [V8.4] 알트코인 시즌 엔진 (상위 250개, 여러 기간을 한 번에 벡터 연산 + 일별 이력)
+# -----------------------------------------------------------------------------
+ALT_SEASON_COINS = 250
+ALT_SEASON_PAGES = 2        # 페이지당 150개 → 스테이블/래핑 토큰을 빼고도 250개 확보
+ALT_SEASON_PER_PAGE = 150
+# 기간(일) → CoinGecko price_change_percentage 값
+# /coins/markets가 지원하는 기간은 1h, 24h, 7d, 14d, 30d, 200d, 1y 뿐 (90일/180일 없음) → 라벨은 실제 기간으로 표기
+ALT_SEASON_WINDOWS = {30: "30d", 200: "200d", 365: "1y"}
+ALT_SEASON_MAIN_WINDOW = 30  # 헤드라인 지수 기간
+ALT_SEASON_LEGACY_KEYS = {"180": "200"}  # 예전 이력 파일에서 200일 값을 180일로 저장했던 키
+ALT_SEASON_HISTORY_PATH = os.path.join(DATA_DIR, "alt_season_history.json")
+STABLECOIN_SYMBOLS = {
+    'usdt', 'usdc', 'dai', 'fdusd', 'tusd', 'usde', 'usds', 'pyusd', 'usdd', 'frax', 'busd', 'usdp',
+    'gusd', 'lusd', 'rlusd', 'usd1', 'usdx', 'susd', 'eurc', 'eurs', 'usdb', 'usd0', 'crvusd', 'gho'
+}
+WRAPPED_PATTERN = r'wrapped|bridged|staked|restaked|liquid staking|\bweth\b|\bwbtc\b|cbbtc|steth'
+
+def _fetch_alt_season_page(page):
+    windows = ",".join(ALT_SEASON_WINDOWS.values())
+    url = (f"https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=market_cap_desc"
+           f"&per_page={ALT_SEASON_PER_PAGE}&page={page}&sparkline=false&price_change_percentage={windows}")
+    res = http_get(url, priority=PRIORITY_BACKGROUND, timeout=10)
+    if res.status_code == 429:
+        raise ThrottledError("api.coingecko.com: 429")
+    return res.json() if res.status_code == 200 else []
+
+def _exclude_pegged(df):
+    """스테이블코인 / 래핑·스테이킹 토큰 제외 (BTC와 같이 움직이거나 가격이 고정돼 지수를 왜곡)"""
+    symbol = df['symbol'].str.lower()
+    name = df['name'].str.lower()
+    stable = symbol.isin(STABLECOIN_SYMBOLS) | (symbol.str.contains('usd') & (df['current_price'] - 1).abs().lt(0.05))
+    wrapped = name.str.contains(WRAPPED_PATTERN, regex=True) | df['id'].str.contains(WRAPPED_PATTERN, regex=True)
+    # w + 목록 내 다른 심볼 (WETH, WBNB 등)
+    wrapped |= symbol.str.startswith('w') & symbol.str[1:].isin(set(symbol))
+    return df[~(stable | wrapped)]
+
+def _record_alt_season(windows):
+    """지수를 날짜별로 저장 (같은 날은 최신 값으로 덮어씀)"""
+    history = load_alt_season_history(as_frame=False)
+    history[datetime.utcnow().strftime("%Y-%m-%d")] = windows
+    try:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        tmp = f"{ALT_SEASON_HISTORY_PATH}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(history, f)
+        os.replace(tmp, ALT_SEASON_HISTORY_PATH)
+    except: pass
+
+def load_alt_season_history(as_frame=True):
+    """일별 알트시즌 지수 이력 (as_frame: index=날짜, 컬럼=기간(일))"""
+    try:
+        with open(ALT_SEASON_HISTORY_PATH, encoding='utf-8') as f:
+            history = json.load(f)
+    except:
+        history = {}
+    for day in history.values():
+        for old, new in ALT_SEASON_LEGACY_KEYS.items():
+            if old in day:
+                day.setdefault(new, day.pop(old))
+    if not as_frame:
+        return history
+    df = pd.DataFrame.from_dict(history, orient='index')
+    if df.empty:
+        return df
+    df.index = pd.to_datetime(df.index)
+    return df.sort_index()
+
+@swr_cache(ttl=600, is_failure=lambda r: not r.get('total_alts'))
 def get_altcoin_season_index():
-    """알트코인 시즌 지수 계산 (Top 50 코인 중 BTC 대비 성과)"""
+    """알트코인 시즌 지수 (상위 250개 알트 중 기간별로 BTC보다 많이 오른 비율, 헤드라인은 ALT_SEASON_MAIN_WINDOW일)"""
+    default = {'index': 50, 'btc_change': 0, 'main_window': ALT_SEASON_MAIN_WINDOW, 'outperformers': 0, 'total_alts': 0, 'is_alt_season': False, 'is_btc_season': False, 'windows': {}}
+    pages = fetch_concurrently({page: (_fetch_alt_season_page, (page,), 12, []) for page in range(1, ALT_SEASON_PAGES + 1)})
+    rows = [row for page in sorted(pages) for row in pages[page]]
+    if not rows:
+        raise ThrottledError("api.coingecko.com: 알트시즌 데이터 없음")  # 캐시는 이전 값 유지
+
     try:
-        # CoinGecko에서 상위 50개 코인의 90일 성과 조회
-        url = "https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=50&page=1&sparkline=false&price_change_percentage=90d"
-        res = requests.get(url, timeout=10)
-        if res.status_code == 200:
-            coins = res.json()
-            btc_change = 0
-            outperformers = 0
-            total_alts = 0
-            
-            for coin in coins:
-                change_90d = coin.get('price_change_percentage_90d_in_currency', 0) or 0
-                if coin['id'] == 'bitcoin':
-                    btc_change = change_90d
-                else:
-                    total_alts += 1
-                    if change_90d > btc_change:
-                        outperformers += 1
-            
-            # 알트코인 시즌 지수: BTC를 이긴 알트코인 비율 (0-100)
-            alt_season_index = (outperformers / total_alts * 100) if total_alts > 0 else 50
-            
-            return {
-                'index': alt_season_index,
-                'btc_90d_change': btc_change,
-                'outperformers': outperformers,
-                'total_alts': total_alts,
-                'is_alt_season': alt_season_index >= 75,  # 75% 이상이면 알트시즌
-                'is_btc_season': alt_season_index <= 25   # 25% 이하면 BTC 시즌
-            }
+        df = pd.DataFrame(rows).drop_duplicates('id')
+        cols = {days: f"price_change_percentage_{key}_in_currency" for days, key in ALT_SEASON_WINDOWS.items()}
+        cols = {days: c for days, c in cols.items() if c in df.columns and df[c].notna().any()}
+        btc = df[df['id'] == 'bitcoin']
+        if btc.empty or not cols:
+            return default
+
+        alts = _exclude_pegged(df[df['id'] != 'bitcoin']).head(ALT_SEASON_COINS)
+        changes = alts[list(cols.values())].astype('float64')
+        btc_changes = btc[list(cols.values())].astype('float64').iloc[0]
+        beat = changes.gt(btc_changes, axis=1).sum()   # 기간별 BTC 대비 초과 성과 코인 수
+        valid = changes.notna().sum()
+        index_by_window = (beat / valid.where(valid > 0) * 100).fillna(50)
+        windows = {days: round(float(index_by_window[c]), 1) for days, c in cols.items()}
+
+        main = ALT_SEASON_MAIN_WINDOW if ALT_SEASON_MAIN_WINDOW in cols else next(iter(cols))
+        alt_season_index = windows[main]
+        _record_alt_season({str(days): v for days, v in windows.items()})
+        return {
+            'index': alt_season_index,
+            'btc_change': float(btc_changes[cols[main]]),
+            'main_window': main,
+            'outperformers': int(beat[cols[main]]),
+            'total_alts': int(valid[cols[main]]),
+            'is_alt_season': alt_season_index >= 75,  # 75% 이상이면 알트시즌
+            'is_btc_season': alt_season_index <= 25,  # 25% 이하면 BTC 시즌
+            'windows': windows
+        }
     except:
-        pass
-    return {'index': 50, 'btc_90d_change': 0, 'outperformers': 0, 'total_alts': 0, 'is_alt_season': False, 'is_btc_season': False}
+        return default
 
 # --- 텔레그램 알림 함수 ---
 def send_telegram_alert(message):
@@ -787,12 +1597,12 @@ def send_telegram_alert(message):
     try:
         url = f"https://api.telegram.org/bot{tg['bot_token']}/sendMessage"
         payload = {'chat_id': tg['chat_id'], 'text': message, 'parse_mode': 'HTML'}
-        res = requests.post(url, data=payload, timeout=5)
+        res = http_post(url, data=payload, timeout=5)
         return res.status_code == 200
     except:
         return False
 
-def check_and_send_alerts(portfolio, rate, mvrv):
+def check_and_send_alerts(portfolio, snapshot, mvrv):
     """매도 신호 및 목표가 도달 시 알림 전송"""
     alerts = []
     
@@ -803,13 +1613,13 @@ def check_and_send_alerts(portfolio, rate, mvrv):
             alerts.append(f"🚨 <b>MVRV 고평가 경고!</b>\n\nMVRV Z-Score가 {mvrv:.1f}에 도달했습니다.\n시장 고점 가능성이 높으니 차익실현을 고려하세요.")
             st.session_state.sent_alerts.add(alert_key)
     
-    # 2. 목표가 도달 알림
+    # 2. 목표가 도달 알림 ([V8.4] 스냅샷 시세 사용)
     for p in portfolio:
         ticker = p['ticker']
         target = p.get('target_price', 0)
         exchange = p.get('exchange', 'Binance')
         
-        cur_p, curr = get_market_price(ticker, exchange)
+        cur_p, curr = snapshot.price(ticker, exchange)
         if cur_p <= 0:
             continue
         
@@ -822,7 +1632,7 @@ def check_and_send_alerts(portfolio, rate, mvrv):
                 st.session_state.sent_alerts.add(alert_key)
         
         # [V7.9] 24시간 급등/급락 알림 (±10% 이상)
-        change_24h = get_24h_change(ticker, exchange)
+        change_24h = snapshot.change(ticker, exchange)
         if abs(change_24h) >= 10:
             alert_key = f"change24h_{ticker}_{datetime.now().strftime('%Y%m%d')}"
             if alert_key not in st.session_state.sent_alerts:
@@ -834,64 +1644,352 @@ def check_and_send_alerts(portfolio, rate, mvrv):
     for msg in alerts:
         send_telegram_alert(msg)
 
-@st.cache_data(ttl=300)
-def get_dxy_index():
+@st.cache_data(ttl=60)
+def get_stock_price(ticker, exchange="US Stock"):
+    """주식 가격 조회 (미국/한국) - 일괄 조회 경로를 종목 1개로 사용"""
+    quotes = fetch_stock_quotes([(ticker, exchange)])
+    return quotes[ticker.upper()][0] if ticker.upper() in quotes else 0.0
+
+# -----------------------------------------------------------------------------
+# [V8.4] 시세 일괄 조회 (거래소별 1회 요청으로 보유 코인 전체 조회)
+# -----------------------------------------------------------------------------
+QUOTE_TTL = 10  # get_market_price 캐시 주기와 동일
+
+@st.cache_resource
+def _get_quote_cache():
+    """프로세스 공용 시세 캐시 {(거래소, 티커): (가격, 통화, 24h 변동률, 저장시각)}"""
+    return {}
+
+def _store_quote(exchange, ticker, price, currency, change_24h=None):
+    _get_quote_cache()[(exchange, ticker.upper())] = (float(price), currency, change_24h, time.time())
+
+def _cached_quote(exchange, ticker, ttl=QUOTE_TTL):
+    """TTL 이내의 캐시된 시세 반환 (없으면 None)"""
+    hit = _get_quote_cache().get((exchange, ticker.upper()))
+    if hit and time.time() - hit[3] <= ttl:
+        return hit
+    return None
+
+@st.cache_data(ttl=3600)
+def _fetch_upbit_krw_markets():
+    """실패하면 예외 → 빈 목록이 캐시되지 않고 다음 호출에서 바로 재시도"""
+    res = http_get("https://api.upbit.com/v1/market/all", timeout=5)
+    res.raise_for_status()
+    markets = frozenset(m['market'][4:] for m in res.json() if m['market'].startswith("KRW-"))
+    if not markets:
+        raise ValueError("upbit: 빈 마켓 목록")
+    return markets
+
+def get_upbit_krw_markets():
+    """업비트 KRW 마켓 목록 (미상장 코드가 섞이면 일괄 조회 전체가 404로 실패하므로 사전 필터용, 실패 시 빈 집합)"""
     try:
-        if YFINANCE_AVAILABLE:
-            hist = yf.Ticker("DX-Y.NYB").history(period="5d")
-            if not hist.empty:
-                curr = float(hist['Close'].iloc[-1])
-                prev = float(hist['Close'].iloc[-2])
-                return curr, (curr-prev)/prev*100
+        return _fetch_upbit_krw_markets()
+    except:
+        return frozenset()
+
+def fetch_upbit_quotes(tickers):
+    """업비트 시세 일괄 조회 (markets=KRW-A,KRW-B,... 1회 요청) → {티커: (가격, 24h 변동률%)}"""
+    tickers = sorted(set(t.upper() for t in tickers))
+    listed = get_upbit_krw_markets()
+    if listed:
+        tickers = [t for t in tickers if t in listed]
+    if not tickers:
+        return {}
+
+    quotes = {}
+    try:
+        url = "https://api.upbit.com/v1/ticker?markets=" + ",".join(f"KRW-{t}" for t in tickers)
+        res = http_get(url, timeout=3)
+        if res.status_code == 200:
+            for row in res.json():
+                t = row['market'][4:]
+                change = (row.get('signed_change_rate') or 0) * 100
+                quotes[t] = (float(row['trade_price']), change)
+                _store_quote("Upbit", t, row['trade_price'], "KRW", change)
     except: pass
-    return 104.5, 0.0
+    return quotes
 
-@st.cache_data(ttl=60)
-def get_stock_price(ticker):
-    """주식 가격 조회 (미국/한국)"""
+# -----------------------------------------------------------------------------
+# [V8.4] CoinGecko 코인 ID 인덱스 (시세 / 24h 변동률 / 김치 프리미엄 / 코인 상세 공용)
+# -----------------------------------------------------------------------------
+COIN_INDEX_PATH = os.path.join(DATA_DIR, "coingecko_ids.json")
+COIN_INDEX_TTL = 86400        # 하루 1회 백그라운드에서 재구성
+COIN_INDEX_RETRY = 600        # 재구성 실패 시 다시 시도하기까지(초)
+COIN_INDEX_RANK_PAGES = 2     # 시총 상위 500개 순위로 같은 심볼을 쓰는 코인 구분
+
+# 인덱스가 아직 없을 때(첫 실행 중 구성 전 / API 장애)만 쓰는 최소 매핑
+COIN_INDEX_SEED = {
+    'BTC': 'bitcoin', 'ETH': 'ethereum', 'SOL': 'solana', 'XRP': 'ripple', 'DOGE': 'dogecoin', 
+    'ADA': 'cardano', 'AVAX': 'avalanche-2', 'DOT': 'polkadot', 'TRX': 'tron', 'LINK': 'chainlink',
+    'MATIC': 'matic-network', 'SHIB': 'shiba-inu', 'LTC': 'litecoin', 'BCH': 'bitcoin-cash',
+    'UNI': 'uniswap', 'XLM': 'stellar', 'ATOM': 'cosmos', 'ETC': 'ethereum-classic',
+    'HBAR': 'hedera-hashgraph', 'FIL': 'filecoin', 'LDO': 'lido-dao', 'APT': 'aptos',
+    'ARB': 'arbitrum', 'NEAR': 'near', 'QNT': 'quant', 'VET': 'vechain', 'ICP': 'internet-computer',
+    'GRT': 'the-graph', 'ALGO': 'algorand', 'STX': 'blockstack', 'AAVE': 'aave', 'EGLD': 'elrond-erd-2',
+    'SAND': 'the-sandbox', 'MANA': 'decentraland', 'THETA': 'theta-token', 'XTZ': 'tezos',
+    'AXS': 'axie-infinity', 'EOS': 'eos', 'CAKE': 'pancakeswap', 'FTM': 'fantom', 'KLAY': 'klay-token',
+    'NEO': 'neo', 'IOTA': 'iota', 'XMR': 'monero', 'MKR': 'maker', 'RUNE': 'thorchain',
+    'SNX': 'havven', 'CRV': 'curve-dao-token', 'FLOW': 'flow'
+}
+
+def _build_coin_index():
+    """/coins/list 전체 + /coins/markets 시총 순위 → {심볼: ID}
+    같은 심볼이 여럿이면: 시총 순위가 높은 코인 → ID/이름이 심볼과 같은 코인 → 짧은 ID 순으로 선택
+    순위 페이지를 하나라도 못 받으면 구성 실패로 처리 (순위 없이 고르면 같은 심볼의 엉뚱한 토큰이 선택됨)
+    """
+    res = http_get("https://api.coingecko.com/api/v3/coins/list", priority=PRIORITY_BACKGROUND, max_wait=30, timeout=20)
+    res.raise_for_status()
+    coins = res.json()
+
+    ranks = {}
+    for page in range(1, COIN_INDEX_RANK_PAGES + 1):
+        url = f"https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=250&page={page}"
+        r = http_get(url, priority=PRIORITY_BACKGROUND, max_wait=30, timeout=10)
+        r.raise_for_status()
+        for c in r.json():
+            if c.get('market_cap_rank'):
+                ranks[c['id']] = c['market_cap_rank']
+
+    best = {}
+    for coin in coins:
+        symbol = (coin.get('symbol') or '').upper()
+        if not symbol:
+            continue
+        cid = coin['id']
+        key = (ranks.get(cid, math.inf), cid not in (symbol.lower(), (coin.get('name') or '').lower()), len(cid))
+        if symbol not in best or key < best[symbol][0]:
+            best[symbol] = (key, cid)
+    return {symbol: cid for symbol, (_, cid) in best.items()}
+
+@st.cache_resource
+def _get_coin_index():
+    """프로세스 공용 인덱스 {'lock', 'ids': {심볼: ID}, 'built_at', 'retry_at', 'refreshing'} - 디스크 캐시로 시작"""
+    index = {'lock': threading.Lock(), 'ids': {}, 'built_at': 0.0, 'retry_at': 0.0, 'refreshing': False}
     try:
-        if YFINANCE_AVAILABLE:
-            df = yf.Ticker(ticker).history(period="1d")
-            if not df.empty: return float(df['Close'].iloc[-1])
+        with open(COIN_INDEX_PATH, encoding='utf-8') as f:
+            saved = json.load(f)
+        index['ids'] = saved['ids']
+        index['built_at'] = saved['built_at']
     except: pass
-    return 0.0
+    return index
+
+def _refresh_coin_index():
+    """인덱스 재구성 (실패하면 기존 인덱스를 그대로 두고 COIN_INDEX_RETRY 후 재시도)"""
+    index = _get_coin_index()
+    try:
+        ids = _build_coin_index()
+        now = time.time()
+        os.makedirs(DATA_DIR, exist_ok=True)
+        tmp = f"{COIN_INDEX_PATH}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'built_at': now, 'ids': ids}, f)
+        os.replace(tmp, COIN_INDEX_PATH)
+        with index['lock']:
+            index['ids'] = ids
+            index['built_at'] = now
+    except:
+        with index['lock']:
+            index['retry_at'] = time.time() + COIN_INDEX_RETRY
+    finally:
+        with index['lock']:
+            index['refreshing'] = False
+
+def coingecko_id(ticker):
+    """심볼 → CoinGecko ID (모르는 심볼은 None) - O(1) 조회, 인덱스가 오래됐으면 백그라운드에서 재구성"""
+    index = _get_coin_index()
+    now = time.time()
+    with index['lock']:
+        if now - index['built_at'] > COIN_INDEX_TTL and now >= index['retry_at'] and not index['refreshing']:
+            index['refreshing'] = True
+            _get_fetch_executor().submit(_refresh_coin_index)
+        ids = index['ids']
+    symbol = ticker.upper()
+    return ids.get(symbol) or COIN_INDEX_SEED.get(symbol)
+
+def fetch_coingecko_quotes(tickers):
+    """CoinGecko simple/price 일괄 조회 (ids=a,b,c 1회 요청, 24h 변동률 포함) → {티커: (USD 가격, 24h 변동률%)}"""
+    ids = {coingecko_id(t): t.upper() for t in set(tickers)}
+    ids.pop(None, None)  # 인덱스에 없는 심볼은 제외
+    if not ids:
+        return {}
+
+    quotes = {}
+    try:
+        url = f"https://api.coingecko.com/api/v3/simple/price?ids={','.join(sorted(ids))}&vs_currencies=usd&include_24hr_change=true"
+        res = http_get(url, timeout=5)
+        if res.status_code == 200:
+            for cid, row in res.json().items():
+                if cid in ids and 'usd' in row:
+                    change = row.get('usd_24h_change') or 0
+                    quotes[ids[cid]] = (float(row['usd']), change)
+                    _store_quote("CoinGecko", ids[cid], row['usd'], "USD", change)
+    except: pass
+    return quotes
+
+def fetch_bithumb_quotes(tickers):
+    """빗썸 ALL_KRW 1회 요청으로 전 종목 시세 조회 → {요청 티커: (가격, 24h 변동률%)}
+    응답에 포함된 모든 종목을 캐시에 저장 (이후 다른 빗썸 종목도 요청 없이 캐시 적중)
+    """
+    wanted = set(t.upper() for t in tickers)
+    quotes = {}
+    try:
+        res = http_get("https://api.bithumb.com/public/ticker/ALL_KRW", timeout=3).json()
+        if res.get('status') == '0000':
+            for t, row in res['data'].items():
+                if not isinstance(row, dict) or 'closing_price' not in row:
+                    continue  # 'date' 등 메타 항목 제외
+                price = float(row['closing_price'])
+                change = float(row.get('fluctate_rate_24H') or 0)
+                _store_quote("Bithumb", t, price, "KRW", change)
+                if t.upper() in wanted:
+                    quotes[t.upper()] = (price, change)
+    except: pass
+    return quotes
+
+def fetch_korbit_quotes(tickers):
+    """코빗 전체 페어 상세 시세 1회 요청 → {요청 티커: (가격, 24h 변동률%)} (모든 KRW 페어를 캐시에 저장)"""
+    wanted = set(t.upper() for t in tickers)
+    quotes = {}
+    try:
+        res = http_get("https://api.korbit.co.kr/v1/ticker/detailed/all", timeout=3).json()
+        for pair, row in res.items():
+            if not pair.endswith("_krw") or not row.get('last'):
+                continue
+            t = pair[:-4].upper()
+            price = float(row['last'])
+            change = float(row.get('changePercent') or 0)
+            _store_quote("Korbit", t, price, "KRW", change)
+            if t in wanted:
+                quotes[t] = (price, change)
+    except: pass
+    return quotes
+
+# 가격 조회에 ccxt를 쓰는 거래소 (표시 이름 → ccxt ID)
+CCXT_QUOTE_EXCHANGES = {"OKX": "okx", "Bitget": "bitget", "Gate.io": "gateio"}
+
+def fetch_ccxt_quotes(exchange, tickers):
+    """ccxt fetch_tickers 1회로 거래소의 보유 코인 전체 조회 (USDT 페어) → {티커: (가격, 24h 변동률%)}
+    상장되지 않은 심볼이 섞이면 일괄 요청 전체가 실패하므로 마켓 목록으로 먼저 거름
+    → 빠진 심볼만 get_market_price에서 개별 fetch_ticker로 조회
+    """
+    ex_id = CCXT_QUOTE_EXCHANGES[exchange]
+    quotes = {}
+    try:
+        markets = guarded_call(ex_id, lambda: get_exchange(ex_id).markets)
+        symbols = [f"{t}/USDT" for t in sorted(set(t.upper() for t in tickers)) if f"{t}/USDT" in markets]
+        if not symbols:
+            return {}
+        for symbol, row in ccxt_call(ex_id, "fetch_tickers", symbols).items():
+            if not row.get('last'):
+                continue
+            t = symbol.split('/')[0]
+            change = row.get('percentage') or 0
+            quotes[t] = (float(row['last']), change)
+            _store_quote(exchange, t, row['last'], "USD", change)
+    except: pass
+    return quotes
+
+STOCK_QUOTE_TTL = 60
+STOCK_CURRENCIES = {"US Stock": "USD", "KR Stock": "KRW"}
+
+def _stock_symbols(ticker, exchange):
+    """yfinance 심볼 후보 (KR Stock은 접미사가 없으면 코스피 .KS / 코스닥 .KQ 둘 다 시도)"""
+    t = ticker.upper()
+    if exchange == "KR Stock" and not t.endswith((".KS", ".KQ")):
+        return [f"{t}.KS", f"{t}.KQ"]
+    return [t]
+
+def fetch_stock_quotes(holdings):
+    """주식 보유 종목 전체를 yf.download 1회로 조회 → {티커: (가격, 통화)}
+    - 최근 5일 일봉의 마지막 종가 (장중에는 당일 봉이 현재가로 갱신됨)
+    - 통화는 거래소 기준 (US Stock → USD, KR Stock → KRW), 결과는 시세 캐시에 저장
+    """
+    if not YFINANCE_AVAILABLE:
+        return {}
+    candidates = {}
+    for ticker, exchange in holdings:
+        if exchange in STOCK_CURRENCIES:
+            for symbol in _stock_symbols(ticker, exchange):
+                candidates[symbol] = (ticker.upper(), exchange)
+    if not candidates:
+        return {}
+
+    quotes = {}
+    try:
+        df_yf = yf_download(list(candidates), period="5d", interval="1d", group_by="ticker", progress=False)
+        for symbol, frame in split_yf_frames(df_yf, list(candidates)).items():
+            ticker, exchange = candidates[symbol]
+            if ticker in quotes:
+                continue  # .KS/.KQ 중 먼저 찾은 쪽 사용
+            price = float(frame['c'].iloc[-1])
+            quotes[ticker] = (price, STOCK_CURRENCIES[exchange])
+            _store_quote(exchange, ticker, price, STOCK_CURRENCIES[exchange])
+    except: pass
+    return quotes
+
+def bulk_quote_jobs(holdings, deadline=6):
+    """(티커, 거래소) 목록을 거래소별 일괄 조회 작업으로 묶음 (fetch_concurrently 형식)"""
+    jobs = {}
+    upbit = [t for t, ex in holdings if ex == "Upbit"]
+    if upbit:
+        jobs['bulk_upbit'] = (fetch_upbit_quotes, (upbit,), deadline, {})
+    stocks = [(t, ex) for t, ex in holdings if ex in STOCK_CURRENCIES]
+    if stocks:
+        jobs['bulk_stocks'] = (fetch_stock_quotes, (stocks,), deadline, {})
+    bithumb = [t for t, ex in holdings if ex == "Bithumb"]
+    if bithumb:
+        jobs['bulk_bithumb'] = (fetch_bithumb_quotes, (bithumb,), deadline, {})
+    korbit = [t for t, ex in holdings if ex == "Korbit"]
+    if korbit:
+        jobs['bulk_korbit'] = (fetch_korbit_quotes, (korbit,), deadline, {})
+    for exchange in CCXT_QUOTE_EXCHANGES:
+        held = [t for t, ex in holdings if ex == exchange]
+        if held and CCXT_AVAILABLE:
+            jobs[f'bulk_{CCXT_QUOTE_EXCHANGES[exchange]}'] = (fetch_ccxt_quotes, (exchange, held), deadline, {})
+    # Binance 가격과 Binance/OKX 24h 변동률은 모두 CoinGecko 한 번의 응답으로 처리
+    usd = [t for t, ex in holdings if ex in ("Binance", "OKX")]
+    if usd:
+        jobs['bulk_coingecko'] = (fetch_coingecko_quotes, (usd,), deadline, {})
+    return jobs
 
 @st.cache_data(ttl=10)
 def get_market_price(ticker, exchange):
-    # [V7.0] 주식 지원
-    if exchange == "US Stock": return get_stock_price(ticker), "USD"
-    elif exchange == "KR Stock": return get_stock_price(ticker), "KRW"
-    
+    # [V7.0] 주식 지원 (일괄 조회 캐시 우선)
+    if exchange in STOCK_CURRENCIES:
+        cached = _cached_quote(exchange, ticker, ttl=STOCK_QUOTE_TTL)
+        if cached:
+            return cached[0], cached[1]
+        return get_stock_price(ticker, exchange), STOCK_CURRENCIES[exchange]
+
+    # [V8.4] 일괄 조회로 채워진 시세가 있으면 네트워크 요청 생략
+    cached = _cached_quote(exchange, ticker)
+    if cached:
+        return cached[0], cached[1]
+
     try:
         if exchange == "Upbit":
-            url = f"https://api.upbit.com/v1/ticker?markets=KRW-{ticker}"
-            return float(requests.get(url, timeout=2).json()[0]['trade_price']), "KRW"
-        elif exchange == "Bithumb":
-            url = f"https://api.bithumb.com/public/ticker/{ticker}_KRW"
-            res = requests.get(url, timeout=2).json()
-            if res['status'] == '0000': return float(res['data']['closing_price']), "KRW"
-        elif exchange == "Korbit":
-            url = f"https://api.korbit.co.kr/v1/ticker?currency_pair={ticker.lower()}_krw"
-            return float(requests.get(url, timeout=2).json()['last']), "KRW"
+            quotes = fetch_upbit_quotes([ticker])
+            if ticker.upper() in quotes: return quotes[ticker.upper()][0], "KRW"
+        elif exchange in ("Bithumb", "Korbit"):
+            # 전 종목 일괄 응답 1회로 같은 거래소의 다른 보유 코인까지 캐시에 채움
+            fetch = fetch_bithumb_quotes if exchange == "Bithumb" else fetch_korbit_quotes
+            quotes = fetch([ticker])
+            if ticker.upper() in quotes: return quotes[ticker.upper()][0], "KRW"
         elif exchange == "Binance":
-            # Binance는 한국에서 지역 제한됨 → CoinGecko API로 대체
-            coin_id_map = {"BTC": "bitcoin", "ETH": "ethereum", "SOL": "solana", "XRP": "ripple", 
-                          "ADA": "cardano", "DOGE": "dogecoin", "DOT": "polkadot", "AVAX": "avalanche-2",
-                          "LINK": "chainlink", "MATIC": "matic-network", "SHIB": "shiba-inu"}
-            coin_id = coin_id_map.get(ticker, ticker.lower())
-            url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd"
-            res = requests.get(url, timeout=5).json()
-            if coin_id in res:
-                return float(res[coin_id]['usd']), "USD"
-            # CoinGecko 실패 시 CCXT OKX로 폴백
+            # Binance는 한국에서 지역 제한됨 → CoinGecko API로 대체 (일괄 조회 캐시 우선)
+            cached = _cached_quote("CoinGecko", ticker)
+            if cached:
+                return cached[0], "USD"
+            quotes = fetch_coingecko_quotes([ticker])
+            if ticker.upper() in quotes:
+                return quotes[ticker.upper()][0], "USD"
+            # CoinGecko 실패(또는 차단 중) 시 CCXT OKX로 폴백
             if CCXT_AVAILABLE:
-                ex = ccxt.okx({'timeout': 5000})
-                return float(ex.fetch_ticker(f"{ticker}/USDT")['last']), "USD"
+                return float(ccxt_call("okx", "fetch_ticker", f"{ticker}/USDT")['last']), "USD"
         elif CCXT_AVAILABLE:
-            ex_map = {"OKX": "okx", "Bitget": "bitget", "Gate.io": "gateio"}
-            if exchange in ex_map:
-                ex = getattr(ccxt, ex_map[exchange])()
-                return float(ex.fetch_ticker(f"{ticker}/USDT")['last']), "USD"
+            # 일괄 조회(fetch_tickers)에 포함되지 않은 심볼만 개별 조회
+            if exchange in CCXT_QUOTE_EXCHANGES:
+                return float(ccxt_call(CCXT_QUOTE_EXCHANGES[exchange], "fetch_ticker", f"{ticker}/USDT")['last']), "USD"
     except: pass
     return 0.0, "USD"
 
@@ -901,54 +1999,346 @@ def get_24h_change(ticker, exchange="Upbit"):
     """24시간 가격 변동률 조회"""
     try:
         if exchange == "Upbit":
-            url = f"https://api.upbit.com/v1/ticker?markets=KRW-{ticker}"
-            res = requests.get(url, timeout=3).json()
-            if res:
-                return res[0].get('signed_change_rate', 0) * 100  # 퍼센트로 변환
+            cached = _cached_quote("Upbit", ticker, ttl=60)
+            if cached and cached[2] is not None:
+                return cached[2]
+            quotes = fetch_upbit_quotes([ticker])
+            if ticker.upper() in quotes:
+                return quotes[ticker.upper()][1]  # 퍼센트로 변환된 값
         elif exchange in ["Binance", "OKX"]:
-            # CoinGecko에서 24시간 변동률 조회
-            coin_id_map = {"BTC": "bitcoin", "ETH": "ethereum", "SOL": "solana", "XRP": "ripple", 
-                          "ADA": "cardano", "DOGE": "dogecoin", "DOT": "polkadot", "AVAX": "avalanche-2"}
-            coin_id = coin_id_map.get(ticker, ticker.lower())
-            url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd&include_24hr_change=true"
-            res = requests.get(url, timeout=5).json()
-            if coin_id in res:
-                return res[coin_id].get('usd_24h_change', 0)
+            # CoinGecko에서 24시간 변동률 조회 (가격과 같은 일괄 응답 사용)
+            cached = _cached_quote("CoinGecko", ticker, ttl=60)
+            if cached and cached[2] is not None:
+                return cached[2]
+            quotes = fetch_coingecko_quotes([ticker])
+            if ticker.upper() in quotes:
+                return quotes[ticker.upper()][1]
+        elif exchange in ("Bithumb", "Korbit"):
+            # 가격과 같은 전 종목 일괄 응답에 24h 변동률이 함께 들어 있음
+            cached = _cached_quote(exchange, ticker, ttl=60)
+            if cached and cached[2] is not None:
+                return cached[2]
+            fetch = fetch_bithumb_quotes if exchange == "Bithumb" else fetch_korbit_quotes
+            quotes = fetch([ticker])
+            if ticker.upper() in quotes:
+                return quotes[ticker.upper()][1]
+        elif exchange in CCXT_QUOTE_EXCHANGES and CCXT_AVAILABLE:
+            # Bitget / Gate.io: fetch_tickers 일괄 응답의 percentage 사용
+            cached = _cached_quote(exchange, ticker, ttl=60)
+            if cached and cached[2] is not None:
+                return cached[2]
+            quotes = fetch_ccxt_quotes(exchange, [ticker])
+            if ticker.upper() in quotes:
+                return quotes[ticker.upper()][1]
     except:
         pass
     return 0.0
 
-# [V7.9] 코인별 김치 프리미엄 조회
+# -----------------------------------------------------------------------------
+# [V8.4] 전체 시장 김치 프리미엄 스캐너 (업비트 1회 + CoinGecko 페이지 몇 개)
+# -----------------------------------------------------------------------------
+KIMCHI_SCAN_PAGES = 4  # CoinGecko 시총 상위 1000개 (업비트 KRW 상장 코인 대부분 포함)
+
+def _fetch_coingecko_markets_page(page):
+    url = f"https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=250&page={page}&sparkline=false"
+    res = http_get(url, timeout=10)
+    return res.json() if res.status_code == 200 else []
+
+@st.cache_data(ttl=60)
+def get_coingecko_markets(pages=KIMCHI_SCAN_PAGES):
+    """CoinGecko /coins/markets 상위 pages×250개 (페이지 동시 조회) → {ID: 행}"""
+    jobs = {page: (_fetch_coingecko_markets_page, (page,), 12, []) for page in range(1, pages + 1)}
+    rows = {}
+    for page_rows in fetch_concurrently(jobs).values():
+        for row in page_rows:
+            rows[row['id']] = row
+    return rows
+
 @st.cache_data(ttl=30)
-def get_kimchi_premium(ticker, rate):
-    """특정 코인의 김치 프리미엄 계산"""
-    try:
-        # 업비트 가격 (KRW)
-        upbit_url = f"https://api.upbit.com/v1/ticker?markets=KRW-{ticker}"
-        upbit_res = requests.get(upbit_url, timeout=3).json()
-        if not upbit_res:
-            return None
-        krw_price = upbit_res[0]['trade_price']
-        
-        # 해외 가격 (USD) - CoinGecko 사용
-        coin_id_map = {"BTC": "bitcoin", "ETH": "ethereum", "SOL": "solana", "XRP": "ripple", 
-                      "ADA": "cardano", "DOGE": "dogecoin", "DOT": "polkadot", "AVAX": "avalanche-2",
-                      "LINK": "chainlink", "MATIC": "matic-network", "SHIB": "shiba-inu"}
-        coin_id = coin_id_map.get(ticker)
-        if not coin_id:
+def scan_kimchi_premiums(rate):
+    """업비트 KRW 마켓 전체의 김치 프리미엄 (프리미엄 내림차순 표)
+    업비트 일괄 시세 1회 + CoinGecko 시장 페이지 조인 후 NumPy로 한꺼번에 계산
+    """
+    columns = ['ticker', 'krw_price', 'usd_price', 'premium', 'market_cap', 'change_24h']
+    listed = sorted(get_upbit_krw_markets())
+    if not listed or rate <= 0:
+        return pd.DataFrame(columns=columns)
+
+    upbit = fetch_upbit_quotes(listed)
+    markets = get_coingecko_markets()
+    tickers = [t for t in listed if t in upbit and markets.get(coingecko_id(t))]
+    if not tickers:
+        return pd.DataFrame(columns=columns)
+
+    rows = [markets[coingecko_id(t)] for t in tickers]
+    krw = np.fromiter((upbit[t][0] for t in tickers), dtype='float64', count=len(tickers))
+    usd = np.fromiter((r.get('current_price') or 0 for r in rows), dtype='float64', count=len(tickers))
+    mcap = np.fromiter((r.get('market_cap') or 0 for r in rows), dtype='float64', count=len(tickers))
+    change = np.fromiter((upbit[t][1] for t in tickers), dtype='float64', count=len(tickers))
+
+    valid = usd > 0
+    premium = np.full(len(tickers), np.nan)
+    premium[valid] = (krw[valid] / (usd[valid] * rate) - 1) * 100
+
+    df = pd.DataFrame({
+        'ticker': tickers, 'krw_price': krw, 'usd_price': usd,
+        'premium': premium, 'market_cap': mcap, 'change_24h': change
+    })
+    return df.dropna(subset=['premium']).sort_values('premium', ascending=False, ignore_index=True)
+
+# -----------------------------------------------------------------------------
+# [V8.4] 마켓 스냅샷 (rerun 1회당 1번 수집 → 모든 탭이 공유)
+# -----------------------------------------------------------------------------
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """한 번의 스크립트 실행 동안 모든 탭이 같은 시세를 보도록 고정된 시장 데이터"""
+    rate: float
+    fx: FxQuote                    # 환율 출처/갱신 시각/USDT 교차 확인
+    quotes: MappingProxyType       # {(티커, 거래소): (가격, 통화)}
+    changes: MappingProxyType      # {(티커, 거래소): 24h 변동률%}
+    market_v83: MappingProxyType   # Sell Score 입력 (btc_price, dom, fng, dxy_chg)
+    btc_weekly: object             # BTC 주봉 (Sell Score RSI용)
+    fng: MappingProxyType          # 공포탐욕지수 상세
+    fng_history: tuple             # 공포탐욕지수 최근 30일 ((datetime, 값), ...)
+    global_data: MappingProxyType  # 도미넌스/총 시가총액
+    alt_season: MappingProxyType   # 알트시즌 지수
+    created_at: datetime
+
+    def price(self, ticker, exchange):
+        """스냅샷 시세 (스냅샷에 없는 종목만 개별 조회)"""
+        quote = self.quotes.get((ticker, exchange))
+        return quote if quote is not None else get_market_price(ticker, exchange)
+
+    def change(self, ticker, exchange):
+        change = self.changes.get((ticker, exchange))
+        return change if change is not None else get_24h_change(ticker, exchange)
+
+    def kimchi_premium(self, ticker):
+        """업비트 KRW 가격 vs 해외 USD 가격 기준 김치 프리미엄 (%)"""
+        if coingecko_id(ticker) is None:
             return None
-            
-        cg_url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd"
-        cg_res = requests.get(cg_url, timeout=5).json()
-        if coin_id not in cg_res:
+        krw = self.quotes.get((ticker, "Upbit"), (0.0, "KRW"))[0]
+        usd = self.quotes.get((ticker, "Binance"), (0.0, "USD"))[0]
+        if krw <= 0 or usd <= 0 or self.rate <= 0:
             return None
-        usd_price = cg_res[coin_id]['usd']
-        
-        # 김치 프리미엄 계산
-        premium = ((krw_price / (usd_price * rate)) - 1) * 100
-        return round(premium, 2)
-    except:
-        return None
+        return round(((krw / (usd * self.rate)) - 1) * 100, 2)
+
+def build_market_snapshot(portfolio):
+    """포트폴리오 시세, 24h 변동률, 환율, 시장 지표를 동시에 수집해 불변 스냅샷 생성
+    1단계: 시장 지표 + 거래소별 일괄 시세를 한꺼번에 시작 (각자 마감 시간 적용)
+    2단계: 일괄 조회로 채워지지 않은 종목만 개별 조회 (역시 동시 실행)
+    → 첫 화면 표시 시간 ≈ 단계별 가장 느린 요청 하나
+    """
+    coin_tickers = sorted(set(p['ticker'] for p in portfolio if "Stock" not in p.get('exchange', '')) | {"BTC"})
+    # 김치 프리미엄 / AI 위원회용 업비트(KRW)·해외(USD) 시세도 함께 조회
+    extra = [(t, "Upbit") for t in coin_tickers] + [(t, "Binance") for t in coin_tickers]
+    holdings = [(p['ticker'], p.get('exchange', 'Binance')) for p in portfolio]
+
+    # 글로벌 지표는 업스트림(CoinGecko /global, FnG, DXY)만 동시에 조회하고 뷰는 아래에서 조합
+    jobs = {
+        'fx': (get_fx_quote, (), 6, FxQuote(FX_FALLBACK_RATE, 'fallback', 0.0, 0.0, 0.0)),
+        'cg_global': (fetch_coingecko_global, (), 5, None),
+        'fng_history': (fetch_fng_history, (), 5, []),
+        'dxy': (fetch_dxy_closes, (), 8, []),
+        'btc_weekly': (get_btc_ohlcv_weekly, (), 10, None),
+        'alt_season': (get_altcoin_season_index, (), 10, {'index': 50, 'is_alt_season': False, 'is_btc_season': False}),
+    }
+    jobs.update(bulk_quote_jobs(holdings + extra))
+    results = fetch_concurrently(jobs)
+
+    quote_jobs = {('quote',) + key: (get_market_price, key, 6, (0.0, "USD")) for key in set(holdings) | set(extra)}
+    change_jobs = {('change',) + key: (get_24h_change, key, 6, 0.0) for key in set(holdings)}
+    per_ticker = fetch_concurrently({**quote_jobs, **change_jobs})
+
+    return MarketSnapshot(
+        rate=results['fx'].rate,
+        fx=results['fx'],
+        quotes=MappingProxyType({name[1:]: v for name, v in per_ticker.items() if name[0] == 'quote'}),
+        changes=MappingProxyType({name[1:]: v for name, v in per_ticker.items() if name[0] == 'change'}),
+        market_v83=MappingProxyType(get_market_data_v83()),
+        btc_weekly=results['btc_weekly'],
+        fng=MappingProxyType(get_fear_greed_index()),
+        fng_history=get_fng_view().history,
+        global_data=MappingProxyType(get_btc_dominance()),
+        alt_season=MappingProxyType(dict(results['alt_season'])),
+        created_at=datetime.now()
+    )
+
+# -----------------------------------------------------------------------------
+# [V8.4] 공용 시장 데이터 서비스 (세션 간 공유 + 백그라운드 갱신)
+# -----------------------------------------------------------------------------
+MARKET_SERVICE_INTERVAL = 10    # 백그라운드 갱신 주기 (초)
+MARKET_SERVICE_IDLE_TTL = 300   # 이 시간 동안 접속이 없는 세션의 종목은 갱신 대상에서 제외 (초)
+
+class MarketDataService:
+    """모든 사용자 세션이 공유하는 시장 데이터 서비스
+    - 백그라운드 스레드가 환율, 시장 지표, BTC 시세, 접속 중인 사용자 보유 종목(합집합)을 주기적으로 갱신
+    - 세션은 메모리에 있는 최신 스냅샷만 읽으므로 접속자가 늘어도 외부 API 호출 수는 그대로
+    """
+    def __init__(self, interval=MARKET_SERVICE_INTERVAL, idle_ttl=MARKET_SERVICE_IDLE_TTL):
+        self.interval = interval
+        self.idle_ttl = idle_ttl
+        self._cond = threading.Condition()
+        self._watchers = {}   # {세션 키: (보유 종목 frozenset, 마지막 접속 시각)}
+        self._snapshot = None
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="market-data-service", daemon=True)
+        self._thread.start()
+
+    def _active_holdings(self):
+        now = time.time()
+        with self._cond:
+            for key in [k for k, (_, seen) in self._watchers.items() if now - seen > self.idle_ttl]:
+                del self._watchers[key]
+            return frozenset().union(*(h for h, _ in self._watchers.values()))
+
+    def _covers(self, holdings):
+        return self._snapshot is not None and all(key in self._snapshot.quotes for key in holdings)
+
+    def refresh(self):
+        """접속 중인 모든 세션의 보유 종목을 합쳐 스냅샷 1개로 갱신"""
+        portfolio = [{'ticker': t, 'exchange': ex} for t, ex in sorted(self._active_holdings())]
+        snapshot = build_market_snapshot(portfolio)
+        with self._cond:
+            self._snapshot = snapshot
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"시장 데이터 갱신 실패: {e}")
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+    def snapshot_for(self, session_key, portfolio, timeout=15):
+        """세션용 스냅샷 반환 (메모리 읽기만, 처음 보는 종목이 있을 때만 다음 갱신까지 대기)"""
+        holdings = frozenset((p['ticker'], p.get('exchange', 'Binance')) for p in portfolio)
+        with self._cond:
+            self._watchers[session_key] = (holdings, time.time())
+            if not self._covers(holdings):
+                self._wakeup.set()
+                self._cond.wait_for(lambda: self._covers(holdings), timeout)
+            snapshot = self._snapshot
+        # 갱신 스레드가 응답하지 않는 경우에만 직접 수집
+        return snapshot if snapshot is not None else build_market_snapshot(portfolio)
+
+@st.cache_resource
+def get_market_service():
+    """프로세스당 1개의 시장 데이터 서비스 (모든 세션 공유)"""
+    return MarketDataService()
+
+# -----------------------------------------------------------------------------
+# [V8.4] 업비트 WebSocket 실시간 시세 스트림
+# -----------------------------------------------------------------------------
+# 로컬 WebSocket 대역 서버로 테스트할 때 UPBIT_WS_URL 환경변수로 교체
+UPBIT_WS_URL = os.environ.get("UPBIT_WS_URL", "wss://api.upbit.com/websocket/v1")
+UPBIT_STREAM_IDLE_TTL = 60  # 이 시간 동안 시세 패널을 그리지 않은 세션의 종목은 구독에서 제외 (초)
+
+class UpbitTickerStream:
+    """업비트 WebSocket ticker 구독 → 메모리 시세 테이블 갱신
+    - 접속 중인 모든 세션의 보유 종목(합집합)을 연결 1개로 구독, 각 세션은 자기 종목만 골라 읽음
+    - 수신한 시세는 공용 시세 캐시에도 기록되어 get_market_price / 스냅샷이 그대로 사용
+    - url만 바꾸면 로컬 WebSocket 대역 서버로 테스트 가능
+    """
+    def __init__(self, url=UPBIT_WS_URL, reconnect_delay=3, idle_ttl=UPBIT_STREAM_IDLE_TTL):
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self.idle_ttl = idle_ttl
+        self._lock = threading.Lock()
+        self._watchers = {}   # {세션 키: (종목 frozenset, 마지막 요청 시각)}
+        self._tickers = frozenset()  # 구독 중인 종목 (활성 세션 합집합)
+        self._quotes = {}   # {티커: {'price', 'change_24h', 'ts'}}
+        self._ws = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._resubscribe = threading.Event()
+
+    def subscribe(self, session_key, tickers):
+        """세션의 구독 종목 등록 (활성 세션 합집합이 바뀐 경우에만 재연결)"""
+        now = time.time()
+        with self._lock:
+            self._watchers[session_key] = (frozenset(t.upper() for t in tickers), now)
+            for key in [k for k, (_, seen) in self._watchers.items() if now - seen > self.idle_ttl]:
+                del self._watchers[key]
+            union = frozenset().union(*(t for t, _ in self._watchers.values()))
+            changed = union != self._tickers
+            self._tickers = union
+            ws = self._ws
+        if changed:
+            self._resubscribe.set()
+            if ws is not None:
+                ws.close()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="upbit-ws", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._resubscribe.set()
+        with self._lock:
+            ws = self._ws
+        if ws is not None:
+            ws.close()
+
+    def quotes(self, tickers=None):
+        """현재 시세 테이블 복사본 {티커: {'price', 'change_24h', 'ts'}} (tickers: 세션이 보유한 종목만)"""
+        wanted = frozenset(t.upper() for t in tickers) if tickers is not None else None
+        with self._lock:
+            return {t: dict(q) for t, q in self._quotes.items()
+                    if t in self._tickers and (wanted is None or t in wanted)}
+
+    def _subscribe_message(self):
+        codes = [f"KRW-{t}" for t in sorted(self._tickers)]
+        return json.dumps([{"ticket": f"crypto-insight-{uuid.uuid4()}"}, {"type": "ticker", "codes": codes}, {"format": "DEFAULT"}])
+
+    def _on_open(self, ws):
+        ws.send(self._subscribe_message())
+
+    def _on_message(self, ws, message):
+        try:
+            data = json.loads(message.decode('utf-8') if isinstance(message, bytes) else message)
+            code, price = data.get('code'), data.get('trade_price')
+            if not code or price is None:
+                return
+            ticker = code.split('-', 1)[-1]
+            change = (data.get('signed_change_rate') or 0) * 100
+            with self._lock:
+                self._quotes[ticker] = {'price': float(price), 'change_24h': change, 'ts': time.time()}
+            _store_quote("Upbit", ticker, price, "KRW", change)
+        except Exception:
+            pass
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._resubscribe.clear()
+            if not self._tickers:
+                self._resubscribe.wait()
+                continue
+            ws = websocket.WebSocketApp(self.url, on_open=self._on_open, on_message=self._on_message)
+            with self._lock:
+                self._ws = ws
+            try:
+                ws.run_forever(ping_interval=60, ping_timeout=10)
+            except Exception as e:
+                print(f"업비트 WebSocket 오류: {e}")
+            with self._lock:
+                self._ws = None
+            # 구독 종목 변경으로 끊은 경우 즉시 재연결, 그 외에는 잠시 대기 후 재연결
+            if not self._resubscribe.is_set():
+                self._stop.wait(self.reconnect_delay)
+
+@st.cache_resource
+def get_upbit_stream():
+    """프로세스당 1개의 업비트 WebSocket 스트림 (모든 세션 공유)"""
+    return UpbitTickerStream()
+
+def _live_fragment(run_every):
+    """Streamlit fragment 데코레이터 (미지원 버전에서는 일반 함수로 동작)"""
+    fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    return fragment(run_every=run_every) if fragment else (lambda fn: fn)
 
 @st.cache_data(ttl=600)  # 10분 캐시
 def get_translated_news(keywords, api_key=None):
@@ -966,7 +2356,7 @@ def get_translated_news(keywords, api_key=None):
     
     for feed in korean_feeds:
         try:
-            f = feedparser.parse(feed['url'])
+            f = feedparser.parse(http_get(feed['url'], timeout=5).content)
             for entry in f.entries[:4]:
                 title = entry.title.strip()
                 if not any(n['title'] == title for n in news_items):
@@ -998,7 +2388,7 @@ def get_translated_news(keywords, api_key=None):
     eng_items = []
     for feed in eng_feeds:
         try:
-            f = feedparser.parse(feed['url'])
+            f = feedparser.parse(http_get(feed['url'], timeout=5).content)
             for entry in f.entries[:3]:
                 title = entry.title.strip()
                 if not any(n['title'] == title for n in eng_items):
@@ -1105,52 +2495,52 @@ def clean_and_translate_desc(text, api_key=None):
         except: return clean_text
     return clean_text
 
-@st.cache_data(ttl=3600)
-def get_coingecko_details(ticker, api_key=None):
-    """API 호출 실패 시 AI로 설명 생성 및 기본값 반환"""
-    default_data = {
+def _default_coin_details(ticker, desc='상세 정보를 불러올 수 없습니다 (API 제한).'):
+    return {
         'name': ticker, 'rank': '-', 'market_cap': 0, 
-        'desc': '상세 정보를 불러올 수 없습니다 (API 제한).',
+        'desc': desc,
         'total_supply': 0, 'circulating_supply': 0,
         'ath': 0, 'ath_change': 0, 'atl': 0, 'atl_change': 0
     }
+
+def get_coingecko_details(ticker, api_key=None):
+    """코인 상세 정보 (CoinGecko 한도 초과 시 AI 호출 없이 즉시 '잠시 후 재시도' 결과 반환, 캐시하지 않음)"""
+    try:
+        return _fetch_coingecko_details(ticker, api_key)
+    except CircuitOpenError:
+        data = _default_coin_details(ticker, '⚠️ CoinGecko 응답이 없어 잠시 후 다시 불러옵니다.')
+        data['throttled'] = True
+        return data
+    except ThrottledError:
+        data = _default_coin_details(ticker, '⏳ CoinGecko 요청이 많아 잠시 후 다시 불러옵니다.')
+        data['throttled'] = True
+        return data
+
+@st.cache_data(ttl=3600)
+def _fetch_coingecko_details(ticker, api_key=None):
+    """API 호출 실패 시 AI로 설명 생성 및 기본값 반환 (요청 한도 초과는 ThrottledError로 전파)"""
+    default_data = _default_coin_details(ticker)
     
     try:
-        # 1. 확장된 정적 매핑 (상위 50위 코인) - API 호출 절약
-        mapping = {
-            'BTC': 'bitcoin', 'ETH': 'ethereum', 'SOL': 'solana', 'XRP': 'ripple', 'DOGE': 'dogecoin', 
-            'ADA': 'cardano', 'AVAX': 'avalanche-2', 'DOT': 'polkadot', 'TRX': 'tron', 'LINK': 'chainlink',
-            'MATIC': 'matic-network', 'SHIB': 'shiba-inu', 'LTC': 'litecoin', 'BCH': 'bitcoin-cash',
-            'UNI': 'uniswap', 'XLM': 'stellar', 'ATOM': 'cosmos', 'ETC': 'ethereum-classic',
-            'HBAR': 'hedera-hashgraph', 'FIL': 'filecoin', 'LDO': 'lido-dao', 'APT': 'aptos',
-            'ARB': 'arbitrum', 'NEAR': 'near', 'QNT': 'quant', 'VET': 'vechain', 'ICP': 'internet-computer',
-            'GRT': 'the-graph', 'ALGO': 'algorand', 'STX': 'blockstack', 'AAVE': 'aave', 'EGLD': 'elrond-erd-2',
-            'SAND': 'the-sandbox', 'MANA': 'decentraland', 'THETA': 'theta-token', 'XTZ': 'tezos',
-            'AXS': 'axie-infinity', 'EOS': 'eos', 'CAKE': 'pancakeswap', 'FTM': 'fantom', 'KLAY': 'klay-token',
-            'NEO': 'neo', 'IOTA': 'iota', 'XMR': 'monero', 'MKR': 'maker', 'RUNE': 'thorchain',
-            'SNX': 'havven', 'CRV': 'curve-dao-token', 'FLOW': 'flow' 
-        }
-        coin_id = mapping.get(ticker.upper())
+        # 1. 코인 ID 인덱스에서 조회 (/search 호출 없음)
+        coin_id = coingecko_id(ticker)
         
         if not coin_id:
-            # 매핑에 없으면 검색 API 호출
-            search = requests.get(f"https://api.coingecko.com/api/v3/search?query={ticker}", timeout=3).json()
-            if search.get('coins'): 
-                coin_id = search['coins'][0]['id']
-            else: 
-                # 검색 실패 시 AI Fallback 시도 (설명 생성)
-                if api_key:
-                    desc_ai = ask_gemini(api_key, f"Explain what is {ticker} cryptocurrency in 3 sentences.", "You are a crypto expert. Answer in Korean.")
-                    if "❌" not in desc_ai:
-                        default_data['desc'] = f"[AI 요약] {desc_ai}"
-                        return default_data
-                return default_data
+            # 인덱스에 없는 코인은 AI Fallback 시도 (설명 생성)
+            if api_key:
+                desc_ai = ask_gemini(api_key, f"Explain what is {ticker} cryptocurrency in 3 sentences.", "You are a crypto expert. Answer in Korean.")
+                if "❌" not in desc_ai:
+                    default_data['desc'] = f"[AI 요약] {desc_ai}"
+                    return default_data
+            return default_data
         
         # 2. 코인 상세 정보 가져오기
         url = f"https://api.coingecko.com/api/v3/coins/{coin_id}?localization=ko&tickers=false&market_data=true"
-        res = requests.get(url, timeout=5)
+        res = http_get(url, priority=PRIORITY_BACKGROUND, timeout=5)
         
-        # API 제한(429) 또는 오류 시 AI Fallback
+        # API 제한(429)은 AI 호출 없이 전파, 그 외 오류 시 AI Fallback
+        if res.status_code == 429:
+            raise ThrottledError("api.coingecko.com: 429")
         if res.status_code != 200:
             if api_key:
                 desc_ai = ask_gemini(api_key, f"{ticker} ({coin_id}) 코인에 대해 3줄로 핵심만 요약해줘.", "암호화폐 전문가입니다. 한국어로 답변하세요.")
@@ -1179,6 +2569,8 @@ def get_coingecko_details(ticker, api_key=None):
             'atl_change': m.get('atl_change_percentage', {}).get('usd', 0) or 0,
             'desc': desc_raw or '설명 정보가 없습니다.'
         }
+    except ThrottledError:
+        raise
     except Exception:
         # 예외 발생 시에도 AI 시도
         if api_key:
@@ -1190,95 +2582,549 @@ def get_coingecko_details(ticker, api_key=None):
             except: pass
         return default_data
 
-# --- 차트 및 분석 함수 ---
-@st.cache_data(ttl=3600)
-def get_weekly_ohlcv(symbol="BTC", weeks=60):
-    """주봉 데이터 (yfinance 우선 - 한국 지역 제한 회피)"""
-    # 1차 시도: yfinance (안정적, 지역 제한 없음)
-    try:
-        if YFINANCE_AVAILABLE:
-            ticker = f"{symbol}-USD" if symbol in ['BTC', 'ETH', 'SOL', 'XRP', 'ADA', 'DOT', 'DOGE', 'AVAX', 'LINK', 'SHIB'] else symbol
-            df_yf = yf.download(ticker, period=f"{weeks}w", interval="1wk", progress=False)
-            if not df_yf.empty:
-                # 멀티인덱스 컬럼 처리
-                if isinstance(df_yf.columns, pd.MultiIndex):
-                    df = pd.DataFrame({
-                        'o': df_yf['Open'].iloc[:, 0] if len(df_yf['Open'].shape) > 1 else df_yf['Open'],
-                        'h': df_yf['High'].iloc[:, 0] if len(df_yf['High'].shape) > 1 else df_yf['High'],
-                        'l': df_yf['Low'].iloc[:, 0] if len(df_yf['Low'].shape) > 1 else df_yf['Low'],
-                        'c': df_yf['Close'].iloc[:, 0] if len(df_yf['Close'].shape) > 1 else df_yf['Close'],
-                        'v': df_yf['Volume'].iloc[:, 0] if len(df_yf['Volume'].shape) > 1 else df_yf['Volume']
-                    })
-                else:
-                    df = pd.DataFrame({
-                        'o': df_yf['Open'], 'h': df_yf['High'], 
-                        'l': df_yf['Low'], 'c': df_yf['Close'], 'v': df_yf['Volume']
-                    })
-                return df
-    except: pass
-    
-    # 2차 시도: CCXT (OKX - 한국 접근 가능)
+# -----------------------------------------------------------------------------
+# [V8.4] 로컬 캔들 저장소 (SQLite, 마지막 캔들 이후만 증분 수집)
+# -----------------------------------------------------------------------------
+CANDLE_DB_PATH = os.path.join(DATA_DIR, "candles.sqlite3")
+CANDLE_COLUMNS = ['o', 'h', 'l', 'c', 'v']
+CCXT_TIMEFRAMES = {"1d": "1d", "1wk": "1w"}  # yfinance interval → ccxt timeframe
+YF_CRYPTO_SYMBOLS = ['BTC', 'ETH', 'SOL', 'XRP', 'ADA', 'DOT', 'DOGE', 'AVAX', 'LINK', 'SHIB']
+CANDLE_SYNC_INTERVAL = 600  # 같은 (심볼, 주기, 출처)를 다시 증분 수집하기까지 최소 간격(초)
+
+def _to_epoch_ms(index):
+    """DatetimeIndex → UTC epoch 밀리초 (int64)"""
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    return ((idx - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).astype('int64')
+
+def normalize_yf_ohlcv(df_yf):
+    """yf.download 결과(단일/멀티인덱스 컬럼)를 o/h/l/c/v 표로 정리"""
+    def col(name):
+        series = df_yf[name]
+        return series.iloc[:, 0] if len(series.shape) > 1 else series
+    df = pd.DataFrame({
+        'o': col('Open'), 'h': col('High'), 'l': col('Low'), 'c': col('Close'), 'v': col('Volume')
+    })
+    return df.dropna(subset=['c'])
+
+class CandleStore:
+    """(심볼, 주기, 출처)별 캔들을 보관하는 SQLite 저장소 (모든 세션/스레드 공유)
+    - candles: 캔들 본문 (ts = UTC epoch ms, 같은 ts는 덮어써 진행 중인 캔들을 갱신)
+    - coverage: 전체 다운로드로 채운 시작 시점 (더 긴 기간을 요청하면 그때만 다시 전체 다운로드)
+    """
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.synced = {}  # {(심볼, 주기, 출처): 마지막 수집 시각} - 일괄 수집 직후 개별 재수집 방지
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS candles ("
+                " symbol TEXT, interval TEXT, source TEXT, ts INTEGER,"
+                " o REAL, h REAL, l REAL, c REAL, v REAL,"
+                " PRIMARY KEY (symbol, interval, source, ts)) WITHOUT ROWID"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS coverage ("
+                " symbol TEXT, interval TEXT, source TEXT, start_ts INTEGER,"
+                " PRIMARY KEY (symbol, interval, source))"
+            )
+
+    def mark_synced(self, symbol, interval, source):
+        with self.lock:
+            self.synced[(symbol, interval, source)] = time.time()
+
+    def recently_synced(self, symbol, interval, source, within=CANDLE_SYNC_INTERVAL):
+        with self.lock:
+            return time.time() - self.synced.get((symbol, interval, source), 0) < within
+
+    def last_ts(self, symbol, interval, source):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT MAX(ts) FROM candles WHERE symbol=? AND interval=? AND source=?",
+                (symbol, interval, source)).fetchone()
+        return row[0]
+
+    def coverage(self, symbol, interval, source):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT start_ts FROM coverage WHERE symbol=? AND interval=? AND source=?",
+                (symbol, interval, source)).fetchone()
+        return row[0] if row else None
+
+    def upsert(self, symbol, interval, source, df, start_ts=None):
+        """캔들 저장 (start_ts: 전체 다운로드일 때 요청한 시작 시점 기록)"""
+        if df is None or df.empty:
+            return 0
+        ts = _to_epoch_ms(df.index)
+        values = df[CANDLE_COLUMNS].astype('float64').to_numpy()
+        rows = [(symbol, interval, source, int(t), *map(float, v)) for t, v in zip(ts, values)]
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO candles VALUES (?,?,?,?,?,?,?,?,?)", rows)
+            if start_ts is not None:
+                self.conn.execute("INSERT OR REPLACE INTO coverage VALUES (?,?,?,?)", (symbol, interval, source, int(start_ts)))
+        return len(rows)
+
+    def load(self, symbol, interval, source, limit=None):
+        """최근 limit개 캔들 (시간 오름차순, DatetimeIndex 'ts')"""
+        query = "SELECT ts, o, h, l, c, v FROM candles WHERE symbol=? AND interval=? AND source=? ORDER BY ts DESC"
+        params = (symbol, interval, source)
+        if limit:
+            query += " LIMIT ?"
+            params += (int(limit),)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        df = pd.DataFrame(rows[::-1], columns=['ts'] + CANDLE_COLUMNS)
+        df['ts'] = pd.to_datetime(df['ts'], unit='ms')
+        return df.set_index('ts')
+
+@st.cache_resource
+def get_candle_store():
+    return CandleStore(CANDLE_DB_PATH)
+
+def _yahoo_ticker(symbol):
+    return f"{symbol}-USD" if symbol in YF_CRYPTO_SYMBOLS else symbol
+
+def _fetch_yahoo_candles(symbol, interval, start):
+    return normalize_yf_ohlcv(yf_download(_yahoo_ticker(symbol), start=start.strftime("%Y-%m-%d"), interval=interval, progress=False))
+
+OKX_PAGE_LIMIT = 300   # OKX 캔들 API가 한 번에 주는 최대 개수 (since부터 앞으로 셈)
+OKX_MAX_PAGES = 12     # 일봉 1000개 + 여유 (이력 엔드포인트로 넘어가 페이지당 100개가 되는 경우 포함)
+
+def _fetch_okx_candles(symbol, interval, start):
+    """start부터 현재까지 페이지를 넘기며 수집 (한 번에 최대 300개라 since만 주면 오래된 구간만 받음)"""
+    pair = f"{symbol}/USDT" if '/' not in symbol else symbol
+    since = int(start.timestamp() * 1000)
+    rows = []
+    for _ in range(OKX_MAX_PAGES):
+        page = ccxt_call("okx", "fetch_ohlcv", pair, CCXT_TIMEFRAMES[interval], since, OKX_PAGE_LIMIT)
+        if not page:
+            break
+        rows.extend(page)
+        if page[-1][0] < since:  # 진행이 없으면 중단 (무한 반복 방지)
+            break
+        since = page[-1][0] + 1
+        if since >= time.time() * 1000:
+            break
+    df = pd.DataFrame(rows, columns=['ts'] + CANDLE_COLUMNS).drop_duplicates('ts', keep='last')
+    df['ts'] = pd.to_datetime(df['ts'], unit='ms')
+    return df.set_index('ts').sort_index()
+
+CANDLE_SOURCES = {"yahoo": _fetch_yahoo_candles, "okx": _fetch_okx_candles}
+
+def sync_candles(symbol, interval, source, count, bar=timedelta(days=1)):
+    """저장소를 최신으로 맞춘 뒤 최근 count개 캔들 반환
+    - 최초 사용(또는 더 긴 기간 요청) 시에만 count개 분량 전체 다운로드
+    - 이후에는 마지막 저장 캔들부터만 받아 덮어쓰기/추가 (진행 중인 마지막 캔들도 갱신)
+    - 최근 CANDLE_SYNC_INTERVAL 안에 수집했으면(일괄 수집 포함) 저장소에서 바로 읽음
+    - 수집이 실패해도 저장된 캔들이 있으면 그대로 반환, 없으면 예외 전파 → 호출자가 다른 출처로 폴백
+    - 실패/빈 응답도 시도 시각을 기록 → 없는 심볼은 CANDLE_SYNC_INTERVAL 동안 다시 요청하지 않음
+    """
+    store = get_candle_store()
+    fetch = CANDLE_SOURCES[source]
+    start = datetime.utcnow() - bar * count
+    start_ms = int((start - datetime(1970, 1, 1)).total_seconds() * 1000)
+    last = store.last_ts(symbol, interval, source)
+    covered = store.coverage(symbol, interval, source)
+    recent = store.recently_synced(symbol, interval, source)
     try:
-        if CCXT_AVAILABLE:
-            pair = f"{symbol}/USDT" if '/' not in symbol else symbol
-            ex = ccxt.okx({'timeout': 10000})
-            df = pd.DataFrame(ex.fetch_ohlcv(pair, '1w', limit=weeks), columns=['ts', 'o', 'h', 'l', 'c', 'v'])
-            df['ts'] = pd.to_datetime(df['ts'], unit='ms')
-            return df.set_index('ts')
-    except: pass
-    
+        if last is None and recent:
+            pass  # 방금 시도했지만 데이터가 없던 심볼 → 아래에서 '캔들 없음'으로 폴백
+        elif last is None or covered is None or start_ms < covered:
+            store.mark_synced(symbol, interval, source)
+            store.upsert(symbol, interval, source, fetch(symbol, interval, start), start_ts=start_ms)
+        elif not recent:
+            store.mark_synced(symbol, interval, source)
+            store.upsert(symbol, interval, source, fetch(symbol, interval, datetime.utcfromtimestamp(last / 1000)))
+    except Exception:
+        if last is None:
+            raise
+    df = store.load(symbol, interval, source, limit=count)
+    if df.empty:
+        raise ValueError(f"{source}: {symbol} {interval} 캔들 없음")
+    return df
+
+# -----------------------------------------------------------------------------
+# [V8.4] 컬럼형 가격 히스토리 (심볼별 NumPy 파일 + 메모리 맵 읽기)
+# -----------------------------------------------------------------------------
+HISTORY_DIR = os.path.join(DATA_DIR, "history")
+HISTORY_REFRESH = 3600        # 파일이 이보다 오래되면 마지막 캔들 이후만 추가 수집(초)
+HISTORY_START_SLACK = timedelta(days=5)  # 주말/휴장일 때문에 첫 캔들이 요청 시작일보다 늦을 수 있는 여유
+
+class HistoryView(NamedTuple):
+    """한 심볼의 날짜 구간 (ts: int64 epoch ms, ohlcv: float64 (5, n)) - 모두 메모리 맵의 슬라이스(복사 없음)"""
+    symbol: str
+    ts: np.ndarray
+    ohlcv: np.ndarray
+
+    def column(self, name='c'):
+        return self.ohlcv[CANDLE_COLUMNS.index(name)]
+
+    def series(self, name='c'):
+        return pd.Series(self.column(name), index=pd.to_datetime(self.ts, unit='ms'), name=self.symbol, copy=False)
+
+def _epoch_ms(when):
+    return int(pd.Timestamp(when).value // 1_000_000)
+
+def _history_paths(symbol):
+    safe = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+    return os.path.join(HISTORY_DIR, f"{safe}.ts.npy"), os.path.join(HISTORY_DIR, f"{safe}.ohlcv.npy")
+
+@st.cache_resource
+def _get_history_maps():
+    """열어둔 메모리 맵 {'lock', 'maps': {심볼: (파일 수정시각, ts, ohlcv)}} (파일이 교체되면 다시 엶)
+    'lock'은 파일 쌍 교체(write_history)와 열기를 함께 보호 → ts/ohlcv가 서로 다른 버전으로 짝지어지지 않음
+    'requested': {심볼: 전체 수집을 요청한 가장 이른 시작 ms} - 상장이 늦어 start까지 못 미치는 심볼을 반복 수집하지 않음
+    """
+    return {'lock': threading.Lock(), 'maps': {}, 'requested': {}}
+
+def _open_history(symbol):
+    ts_path, ohlcv_path = _history_paths(symbol)
+    registry = _get_history_maps()
+    with registry['lock']:
+        try:
+            mtime = os.path.getmtime(ts_path)
+        except OSError:
+            return None
+        hit = registry['maps'].get(symbol)
+        if hit is None or hit[0] != mtime:
+            ts = np.load(ts_path, mmap_mode='r')
+            ohlcv = np.load(ohlcv_path, mmap_mode='r')
+            n = min(len(ts), ohlcv.shape[1])
+            hit = (mtime, ts[:n], ohlcv[:, :n])
+            registry['maps'][symbol] = hit
+        return hit
+
+def read_history(symbol, start=None, end=None):
+    """저장된 일봉 히스토리의 [start, end] 구간 (없으면 None) - 정렬된 ts에서 이진 탐색으로 잘라 복사 없이 반환"""
+    hit = _open_history(symbol)
+    if hit is None:
+        return None
+    _, ts, ohlcv = hit
+    lo = np.searchsorted(ts, _epoch_ms(start), 'left') if start is not None else 0
+    hi = np.searchsorted(ts, _epoch_ms(end), 'right') if end is not None else len(ts)
+    return HistoryView(symbol, ts[lo:hi], ohlcv[:, lo:hi])
+
+def history_frame(symbols, start=None, end=None, column='c'):
+    """여러 심볼의 한 컬럼을 날짜 기준으로 합친 표 (컬럼 = 심볼)"""
+    views = [read_history(s, start, end) for s in symbols]
+    series = [v.series(column) for v in views if v is not None and len(v.ts)]
+    return pd.concat(series, axis=1) if series else pd.DataFrame()
+
+def write_history(symbol, df):
+    """o/h/l/c/v 표를 기존 파일과 합쳐 저장 (같은 ts는 새 값) - 임시 파일에 쓴 뒤 교체해 읽는 쪽은 항상 완성된 파일만 봄"""
+    if df is None or df.empty:
+        return
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    ts_all = np.asarray(_to_epoch_ms(df.index), dtype='int64')
+    ohlcv_all = df[CANDLE_COLUMNS].to_numpy(dtype='float64').T
+    old = _open_history(symbol)
+    if old is not None:
+        keep = ~np.isin(old[1], ts_all)
+        ts_all = np.concatenate([old[1][keep], ts_all])
+        ohlcv_all = np.concatenate([old[2][:, keep], ohlcv_all], axis=1)
+    order = np.argsort(ts_all, kind='stable')
+    ts_path, ohlcv_path = _history_paths(symbol)
+    staged = []
+    for path, arr in ((ohlcv_path, np.ascontiguousarray(ohlcv_all[:, order])), (ts_path, ts_all[order])):
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'wb') as f:
+            np.save(f, arr)
+        staged.append((tmp, path))
+    # 두 파일 교체는 열기와 같은 잠금 안에서 → 읽는 쪽은 항상 같은 버전의 ts/ohlcv 쌍을 봄
+    # (ts 파일을 마지막에 교체 - 읽는 쪽은 ts 파일 수정시각으로 새로 열지 판단)
+    with _get_history_maps()['lock']:
+        for tmp, path in staged:
+            os.replace(tmp, path)
+
+def split_yf_frames(df_yf, tickers):
+    """group_by="ticker"로 받은 yf.download 결과를 {티커: o/h/l/c/v 표}로 분리 (데이터 없는 티커는 제외)"""
+    frames = {}
+    if isinstance(df_yf.columns, pd.MultiIndex):
+        available = set(df_yf.columns.get_level_values(0))
+        for t in tickers:
+            if t in available:
+                frame = normalize_yf_ohlcv(df_yf[t])
+                if not frame.empty:
+                    frames[t] = frame
+    elif len(tickers) == 1:
+        frame = normalize_yf_ohlcv(df_yf)
+        if not frame.empty:
+            frames[tickers[0]] = frame
+    return frames
+
+@st.cache_resource
+def _get_history_write_lock():
+    return threading.Lock()
+
+def ensure_history(symbols, start):
+    """Yahoo 심볼들의 일봉 히스토리를 start 이후까지 갖춰둠
+    - 파일이 없거나 start까지 못 미치면 start부터 전체 (파일이 최신이어도), HISTORY_REFRESH보다 오래됐으면 마지막 캔들부터
+    - 각 그룹은 yf.download 1회로 묶어서 수집, 최근에 갱신한 파일은 네트워크 없이 통과
+    """
+    start_ms = _epoch_ms(start)
+    slack_ms = int(HISTORY_START_SLACK.total_seconds() * 1000)
+    requested = _get_history_maps()['requested']
+    with _get_history_write_lock():
+        full, incremental = [], []
+        since = None
+        for sym in dict.fromkeys(symbols):
+            hit = _open_history(sym)
+            fresh = hit is not None and time.time() - hit[0] < HISTORY_REFRESH
+            if hit is None or not len(hit[1]):
+                full.append(sym)
+            elif hit[1][0] > start_ms + slack_ms and start_ms < requested.get(sym, float('inf')):
+                full.append(sym)
+            elif not fresh:
+                incremental.append(sym)
+                since = int(hit[1][-1]) if since is None else min(since, int(hit[1][-1]))
+        groups = [(full, start_ms), (incremental, since)]
+        for group, group_start in groups:
+            if not group:
+                continue
+            try:
+                df_yf = yf_download(group, start=pd.Timestamp(group_start, unit='ms').strftime("%Y-%m-%d"),
+                                    interval="1d", group_by="ticker", progress=False)
+            except: continue
+            if group is full:  # start부터 받았는데도 짧은 파일이면 그 이전은 데이터 자체가 없는 구간
+                for sym in group:
+                    requested[sym] = min(requested.get(sym, start_ms), start_ms)
+            for sym, frame in split_yf_frames(df_yf, group).items():
+                write_history(sym, frame)
+
+def prefetch_daily_candles(symbols, days=1000):
+    """여러 심볼의 일봉을 yf.download 1회(group_by="ticker")로 받아 캔들 저장소에 채움
+    → 이후 get_daily_candles / get_weekly_ohlcv는 심볼별 요청 없이 저장소에서 읽음
+    - 처음 보는 심볼은 days 분량 전체, 나머지는 가장 오래된 마지막 캔들부터 (최대 2회 요청)
+    - Yahoo에 없는 심볼은 건너뜀 (개별 조회 시 OKX로 폴백)
+    """
+    if not YFINANCE_AVAILABLE:
+        return
+    store = get_candle_store()
+    start = datetime.utcnow() - timedelta(days=min(days, 3650))
+    start_ms = _epoch_ms(start)
+    full, incremental, since = [], [], None
+    for symbol in dict.fromkeys(symbols):
+        last = store.last_ts(symbol, "1d", "yahoo")
+        covered = store.coverage(symbol, "1d", "yahoo")
+        if last is None and store.recently_synced(symbol, "1d", "yahoo"):
+            continue  # 최근 일괄 수집에서 데이터가 없던 심볼
+        if last is None or covered is None or start_ms < covered:
+            full.append(symbol)
+        elif not store.recently_synced(symbol, "1d", "yahoo"):
+            incremental.append(symbol)
+            since = last if since is None else min(since, last)
+
+    for group, group_start, coverage in ((full, start_ms, start_ms), (incremental, since, None)):
+        if not group:
+            continue
+        tickers = {_yahoo_ticker(s): s for s in group}
+        for symbol in group:  # 실패하거나 없는 심볼도 표시해 CANDLE_SYNC_INTERVAL 동안 반복 요청하지 않음
+            store.mark_synced(symbol, "1d", "yahoo")
+        try:
+            df_yf = yf_download(list(tickers), start=pd.Timestamp(group_start, unit='ms').strftime("%Y-%m-%d"),
+                                interval="1d", group_by="ticker", progress=False)
+        except: continue
+        for ticker, frame in split_yf_frames(df_yf, list(tickers)).items():
+            store.upsert(tickers[ticker], "1d", "yahoo", frame, start_ts=coverage)
+
+# --- 차트 및 분석 함수 ---
+DAILY_BASE_DAYS = 1000  # 심볼별 일봉 기본 보관 기간 (Pi Cycle 1000일 / 주봉 2년 / 60주가 모두 한 번의 수집을 공유)
+
+# 상위 주기 → (pandas 리샘플 규칙, 일봉 기준 길이)
+# 크립토 주봉은 거래소 기준(월요일 00:00 UTC 시작)에 맞춰 월요일부터 집계하고 시작일로 라벨링
+RESAMPLE_RULES = {"1wk": ("W-MON", 7), "1mo": ("MS", 31)}
+
+def resample_candles(daily, interval):
+    """일봉 → 상위 주기 캔들 (시가=첫 값, 고가=최대, 저가=최소, 종가=마지막, 거래량=합계)
+    마지막 캔들은 진행 중인 주/월까지의 값 (거래소 주봉의 미완성 캔들과 동일)
+    """
+    rule, _ = RESAMPLE_RULES[interval]
+    agg = daily.resample(rule, closed='left', label='left').agg({'o': 'first', 'h': 'max', 'l': 'min', 'c': 'last', 'v': 'sum'})
+    return agg.dropna(subset=['c'])
+
+@swr_cache(ttl=3600)
+def get_daily_candles(symbol="BTC", days=DAILY_BASE_DAYS):
+    """심볼별 기본 일봉 (yfinance 우선 - 한국 지역 제한 회피, 로컬 저장소에 증분 수집)
+    모든 주기의 원천 데이터 → 일봉/주봉 조회가 업스트림 요청 하나를 공유
+    """
+    # 1차 시도: yfinance (안정적, 지역 제한 없음) → 2차 시도: CCXT (OKX - 한국 접근 가능)
+    for source in ("yahoo", "okx"):
+        try:
+            return sync_candles(symbol, "1d", source, min(days, 3650) if source == "yahoo" else min(days, 1000))
+        except: pass
     return None
 
-@st.cache_data(ttl=3600)
+def get_candles(symbol, interval, count):
+    """interval 캔들 최근 count개 (1d는 그대로, 상위 주기는 일봉에서 리샘플링)"""
+    # 기본 보관 기간 이하는 모두 DAILY_BASE_DAYS로 요청 → 모든 주기/호출처가 같은 캐시 키(수집 1번)를 공유
+    # 상위 주기는 진행 중인 첫 캔들을 채우도록 한 주기분 여유를 더함
+    needed = count if interval == "1d" else (count + 1) * RESAMPLE_RULES[interval][1]
+    daily = get_daily_candles(symbol, max(DAILY_BASE_DAYS, needed))
+    if daily is None or daily.empty:
+        return None
+    df = daily if interval == "1d" else resample_candles(daily, interval)
+    return df.tail(count)
+
+def get_weekly_ohlcv(symbol="BTC", weeks=60):
+    """주봉 데이터 (일봉 저장소에서 월요일 기준 주봉으로 리샘플링)"""
+    return get_candles(symbol, "1wk", weeks)
+
 def get_daily_ohlcv(symbol="BTC", days=1000):
-    """일봉 데이터 (yfinance 우선 - 한국 지역 제한 회피) - Pi Cycle 계산용"""
-    # 1차 시도: yfinance (안정적, 지역 제한 없음)
-    try:
-        if YFINANCE_AVAILABLE:
-            ticker = f"{symbol}-USD" if symbol in ['BTC', 'ETH', 'SOL', 'XRP', 'ADA', 'DOT', 'DOGE'] else symbol
-            df_yf = yf.download(ticker, period=f"{min(days, 3650)}d", interval="1d", progress=False)
-            if not df_yf.empty:
-                # 멀티인덱스 컬럼 처리
-                if isinstance(df_yf.columns, pd.MultiIndex):
-                    df = pd.DataFrame({
-                        'o': df_yf['Open'].iloc[:, 0] if len(df_yf['Open'].shape) > 1 else df_yf['Open'],
-                        'h': df_yf['High'].iloc[:, 0] if len(df_yf['High'].shape) > 1 else df_yf['High'],
-                        'l': df_yf['Low'].iloc[:, 0] if len(df_yf['Low'].shape) > 1 else df_yf['Low'],
-                        'c': df_yf['Close'].iloc[:, 0] if len(df_yf['Close'].shape) > 1 else df_yf['Close'],
-                        'v': df_yf['Volume'].iloc[:, 0] if len(df_yf['Volume'].shape) > 1 else df_yf['Volume']
-                    })
-                else:
-                    df = pd.DataFrame({
-                        'o': df_yf['Open'], 'h': df_yf['High'], 
-                        'l': df_yf['Low'], 'c': df_yf['Close'], 'v': df_yf['Volume']
-                    })
-                return df
-    except: pass
-    
-    # 2차 시도: CCXT (OKX - 한국 접근 가능)
+    """일봉 데이터 - Pi Cycle 계산용"""
+    return get_candles(symbol, "1d", days)
+
+# -----------------------------------------------------------------------------
+# [V8.4] 멀티 에셋 기술적 지표 엔진 (시간 × 심볼 종가 행렬을 NumPy로 한 번에 계산)
+# -----------------------------------------------------------------------------
+# 지표 파라미터 (기존 ta 라이브러리 기본값과 동일)
+INDICATOR_PARAMS = {
+    'rsi': 14,
+    'sma': 20,
+    'ema': 20,
+    'macd': (12, 26, 9),   # (fast, slow, signal)
+    'bb': (20, 2.0),       # (기간, 표준편차 배수)
+}
+
+def _sma(x, window):
+    """열별 단순 이동평균 (x: T × N, 앞쪽 window-1개와 결측 구간은 NaN)"""
+    out = np.full(x.shape, np.nan)
+    if len(x) >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(x, window, axis=0).mean(axis=-1)
+    return out
+
+def _rolling_std(x, window):
+    """열별 이동 표준편차 (모집단 기준 ddof=0 - 볼린저 밴드 정의)"""
+    out = np.full(x.shape, np.nan)
+    if len(x) >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(x, window, axis=0).std(axis=-1)
+    return out
+
+def _ewm(x, alpha, min_periods):
+    """열별 지수 이동평균 (pandas ewm(adjust=False)와 동일한 재귀식)
+    시간 축으로만 루프를 돌고 심볼 축은 벡터 연산 → 심볼 수와 무관하게 T번 반복
+    각 열은 첫 유효값으로 시작하고 min_periods개가 쌓이기 전까지는 NaN
+    """
+    out = np.full(x.shape, np.nan)
+    state = np.full(x.shape[1], np.nan)
+    count = np.zeros(x.shape[1])
+    for t in range(len(x)):
+        row = x[t]
+        valid = ~np.isnan(row)
+        state = np.where(valid, np.where(np.isnan(state), row, state + alpha * (row - state)), state)
+        count += valid
+        out[t] = np.where(count >= min_periods, state, np.nan)
+    return out
+
+def _rsi(x, window):
+    """Wilder RSI (평활 계수 1/window)"""
+    diff = np.full(x.shape, np.nan)
+    diff[1:] = x[1:] - x[:-1]
+    # 각 열의 첫 유효값 위치는 변화량 0으로 시작 (ta RSIIndicator와 같은 기준점)
+    first = ~np.isnan(x) & np.isnan(diff)
+    diff[first] = 0.0
+    up = _ewm(np.where(np.isnan(diff), np.nan, np.clip(diff, 0, None)), 1 / window, window)
+    down = _ewm(np.where(np.isnan(diff), np.nan, np.clip(-diff, 0, None)), 1 / window, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + up / down)
+    return np.where(down == 0, np.where(up > 0, 100.0, 50.0), rsi)
+
+class IndicatorSet(NamedTuple):
+    """compute_indicators 결과 (모든 배열은 T × N, 열 순서 = symbols)"""
+    index: object       # 시간 인덱스 (DatetimeIndex)
+    symbols: list
+    values: dict        # 지표 이름 → ndarray
+
+    def table(self, tail=None):
+        """타이디 테이블: (날짜, 심볼) MultiIndex × 지표 열"""
+        rows = slice(-tail, None) if tail else slice(None)
+        index = pd.MultiIndex.from_product([self.index[rows], self.symbols], names=['date', 'symbol'])
+        return pd.DataFrame({name: arr[rows].ravel() for name, arr in self.values.items()}, index=index)
+
+    def latest(self):
+        """심볼별 최신 지표 (심볼 인덱스 × 지표 열) - UI에서 .loc[심볼]로 바로 조회"""
+        if not len(self.index):
+            return pd.DataFrame(columns=list(self.values))
+        # 종가는 ffill 되어 있으므로 마지막 행이 NaN이면 해당 지표를 계산할 기간이 부족한 심볼
+        return pd.DataFrame({name: arr[-1] for name, arr in self.values.items()}, index=pd.Index(self.symbols, name='symbol'))
+
+    def series(self, name, symbol):
+        """한 심볼의 지표 시계열 (차트용)"""
+        return pd.Series(self.values[name][:, self.symbols.index(symbol)], index=self.index, name=name)
+
+def compute_indicators(closes, params=INDICATOR_PARAMS):
+    """종가 행렬(DataFrame: 시간 × 심볼) → RSI / SMA / EMA / MACD / 볼린저 밴드
+    심볼별 pandas 파이프라인 없이 전체 행렬을 한 번에 계산 (100종목도 수 ms)
+    """
+    x = closes.ffill().to_numpy(dtype='float64')  # 거래일이 다른 자산 혼합 시 직전 종가 유지 (상장 전 구간은 NaN 유지)
+    fast, slow, signal = params['macd']
+    bb_window, bb_k = params['bb']
+    macd = _ewm(x, 2 / (fast + 1), fast) - _ewm(x, 2 / (slow + 1), slow)
+    macd_signal = _ewm(macd, 2 / (signal + 1), signal)
+    bb_mid = _sma(x, bb_window)
+    bb_std = _rolling_std(x, bb_window)
+    bb_upper, bb_lower = bb_mid + bb_k * bb_std, bb_mid - bb_k * bb_std
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bb_pct = (x - bb_lower) / (bb_upper - bb_lower)
+    return IndicatorSet(closes.index, list(closes.columns), {
+        'close': x,
+        'rsi': _rsi(x, params['rsi']),
+        'sma': _sma(x, params['sma']),
+        'ema': _ewm(x, 2 / (params['ema'] + 1), params['ema']),
+        'macd': macd,
+        'macd_signal': macd_signal,
+        'macd_hist': macd - macd_signal,
+        'bb_upper': bb_upper,
+        'bb_mid': bb_mid,
+        'bb_lower': bb_lower,
+        'bb_pct': bb_pct,
+    })
+
+def close_matrix(symbols, interval="1wk", count=60):
+    """심볼별 일봉 저장소 → 종가 행렬 (시간 × 심볼), 상위 주기는 행렬 전체를 한 번에 리샘플링"""
+    closes = {}
+    for symbol in dict.fromkeys(symbols):
+        daily = get_daily_candles(symbol, DAILY_BASE_DAYS)
+        if daily is not None and not daily.empty:
+            closes[symbol] = daily['c']
+    if not closes:
+        return pd.DataFrame()
+    wide = pd.DataFrame(closes)
+    if interval != "1d":
+        wide = wide.resample(RESAMPLE_RULES[interval][0], closed='left', label='left').last()
+    return wide.dropna(how='all').tail(count)
+
+def latest_indicator(closes, symbol, name, default=None):
+    """단일 종가 시계열의 최신 지표 값 (Sell Score 등 BTC 하나만 필요할 때)"""
     try:
-        if CCXT_AVAILABLE:
-            ex = ccxt.okx({'timeout': 10000})
-            df = pd.DataFrame(ex.fetch_ohlcv(f'{symbol}/USDT', '1d', limit=min(days, 1000)), columns=['ts', 'o', 'h', 'l', 'c', 'v'])
-            df['ts'] = pd.to_datetime(df['ts'], unit='ms')
-            return df.set_index('ts')
-    except: pass
-    
-    return None
+        value = compute_indicators(closes.to_frame(symbol)).latest().at[symbol, name]
+        return default if pd.isna(value) else float(value)
+    except: return default
 
-def analyze_technical(df):
-    if df is None or len(df) < 30: return {"signal": "N/A", "score": 0, "summary": []}
-    close = df['c']
-    sma20 = SMAIndicator(close, 20).sma_indicator().iloc[-1]
-    rsi = RSIIndicator(close, 14).rsi().iloc[-1]
+def score_technical(latest):
+    """지표 테이블(심볼 × 지표) → 심볼별 점수/시그널 (전 종목 벡터 연산)
+    추세: 종가 vs 20주선 (±20) / 모멘텀: RSI 과매도 +30, 과매수 -20
+    """
+    rsi = latest['rsi'].to_numpy(dtype='float64')
+    above = (latest['close'] > latest['sma']).to_numpy()
+    score = 50 + np.where(above, 20, -20) + np.select([rsi < 30, rsi > 70], [30, -20], 0)
+    ready = ~(np.isnan(rsi) | latest['sma'].isna().to_numpy())
+    signal = np.where(~ready, "N/A", np.select([score >= 60, score <= 40], ["매수", "매도"], "중립"))
+    return pd.DataFrame({'score': np.where(ready, score, 0), 'signal': signal}, index=latest.index)
+
+def analyze_technical(latest, symbol):
+    """지표 테이블의 한 심볼 → 시그널/점수/요약 문구"""
+    if symbol not in latest.index: return {"signal": "N/A", "score": 0, "summary": []}
+    row, scored = latest.loc[symbol], score_technical(latest.loc[[symbol]]).loc[symbol]
+    if scored['signal'] == "N/A": return {"signal": "N/A", "score": 0, "summary": []}
     summary = []
-    score = 50
-    if close.iloc[-1] > sma20: score += 20; summary.append("📈 주가 > 20주선 (상승 추세)")
-    else: score -= 20; summary.append("📉 주가 < 20주선 (하락 추세)")
-    if rsi < 30: score += 30; summary.append(f"💎 과매도 (RSI {rsi:.0f})")
-    elif rsi > 70: score -= 20; summary.append(f"🔥 과매수 (RSI {rsi:.0f})")
-    sig = "매수" if score >= 60 else "매도" if score <= 40 else "중립"
-    return {"signal": sig, "score": score, "summary": summary}
+    if row['close'] > row['sma']: summary.append("📈 주가 > 20주선 (상승 추세)")
+    else: summary.append("📉 주가 < 20주선 (하락 추세)")
+    if row['rsi'] < 30: summary.append(f"💎 과매도 (RSI {row['rsi']:.0f})")
+    elif row['rsi'] > 70: summary.append(f"🔥 과매수 (RSI {row['rsi']:.0f})")
+    return {"signal": scored['signal'], "score": int(scored['score']), "summary": summary}
 
 @st.cache_data(ttl=3600)
 def get_historical_data(ticker, days=365):
@@ -1287,16 +3133,6 @@ def get_historical_data(ticker, days=365):
     except: pass
     return None
 
-@st.cache_data(ttl=3600)
-def get_btc_dominance():
-    try: return requests.get("https://api.coingecko.com/api/v3/global", timeout=5).json()['data']['market_cap_percentage']['btc']
-    except: return 58.0
-
-@st.cache_data(ttl=1800)
-def get_fear_greed():
-    try: return int(requests.get("https://api.alternative.me/fng/?limit=1", timeout=5).json()['data'][0]['value'])
-    except: return 50
-
 # --- [V6.8] 스마트 목표가 계산 함수 ---
 def calculate_smart_targets(price, ath):
     if price <= 0: return {}
@@ -1318,7 +3154,7 @@ def calculate_smart_targets(price, ath):
     return targets
 
 # --- [V7.0] 헤지 데이터 분석 함수 ---
-@st.cache_data(ttl=3600)
+@swr_cache(ttl=3600, is_failure=lambda r: r[0] is None)
 def get_hedge_data(crypto_ticker="BTC-USD", user_stocks=[]):
     """비트코인과 [추천 헤지 자산 + 내 주식]의 상관관계 분석"""
     tickers = {
@@ -1334,7 +3170,9 @@ def get_hedge_data(crypto_ticker="BTC-USD", user_stocks=[]):
             tickers[f"{s} (My)"] = s
     try:
         if YFINANCE_AVAILABLE:
-            df = yf.download(list(tickers.values()), period="6mo", progress=False)['Close']
+            start = datetime.utcnow() - timedelta(days=183)
+            ensure_history(list(tickers.values()), start)
+            df = history_frame(list(tickers.values()), start=start)
             inv_map = {v: k for k, v in tickers.items()}
             df.columns = [inv_map.get(c, c) for c in df.columns]
             normalized = (df / df.iloc[0] - 1) * 100
@@ -1397,7 +3235,7 @@ def update_single_key_db(username, key_type, value, is_telegram=False):
 # -----------------------------------------------------------------------------
 # [수정] 사이드바: 로그인 + 개별 API 키 관리 기능
 # -----------------------------------------------------------------------------
-def render_sidebar():
+def render_sidebar(snapshot):
     st.sidebar.title("🐋 크립토 인사이트 V8.2")
     
     # [V7.9] 이미 로그인된 경우 로그인 폼 스킵 (main에서 처리)
@@ -1455,15 +3293,32 @@ def render_sidebar():
         render_key_input("Groq API Key", "groq_key", "groq")
         st.markdown("[👉 Groq 무료 API 키 발급](https://console.groq.com/keys)", unsafe_allow_html=True)
         
+        # 6. [V8.4] FRED (무료 - 기준금리 / M2 / CPI 매크로 지표)
+        render_key_input("FRED API Key", "fred_key", "fred")
+        st.markdown("[👉 FRED 무료 API 키 발급](https://fred.stlouisfed.org/docs/api/api_key.html)", unsafe_allow_html=True)
+        
         # 텔레그램은 별도 섹션으로 이동됨
         st.caption("📢 텔레그램 알림은 아래 별도 섹션에서 설정")
 
     # 4. 나머지 사이드바 기능 (기존 유지)
     st.sidebar.divider()
-    rate = get_usd_krw_rate()
+    rate = snapshot.rate
     st.sidebar.markdown(f"**💵 환율:** `{rate:,.0f} 원/$`")
+    # [V8.4] 환율 출처와 갱신 시점, USDT 내재 환율과의 괴리 표시
+    fx = snapshot.fx
+    if fx.source == 'fallback':
+        st.sidebar.caption("⚠️ 환율 조회 실패 - 기본값 사용 중")
+    else:
+        source_label = "Yahoo" if fx.source == 'yahoo' else "업비트 USDT (Yahoo 지연)"
+        usdt_note = f" · USDT {fx.usdt_krw:,.0f}원 ({fx.usdt_premium:+.2f}%)" if fx.usdt_krw else ""
+        st.sidebar.caption(f"{source_label} · {int(fx.age // 60)}분 전{usdt_note}")
     
     auto_refresh = st.sidebar.checkbox("⚡ 실시간 갱신 (10초)", value=False)
+    # [V8.4] 전체 페이지 재실행 없이 업비트 보유 코인 시세만 실시간 갱신
+    stream_mode = st.sidebar.checkbox(
+        "📡 실시간 스트리밍 (업비트 WebSocket)", value=False, disabled=not WEBSOCKET_AVAILABLE,
+        help="업비트 보유 코인 시세만 실시간으로 갱신합니다." if WEBSOCKET_AVAILABLE else "websocket-client 패키지가 필요합니다."
+    )
     
     st.sidebar.divider()
     
@@ -1623,35 +3478,107 @@ def render_sidebar():
             - 이 단계를 해야 메시지 수신 가능!
             """)
     
-    # 반환값 (Gemini, OpenAI, Claude, Grok, Groq 키, 자동갱신여부)
+    # 반환값 (Gemini, OpenAI, Claude, Grok, Groq 키, 자동갱신여부, 스트리밍여부)
     return (
         st.session_state.gemini_key, 
         st.session_state.openai_key, 
         st.session_state.claude_key, 
         st.session_state.grok_key, 
         st.session_state.groq_key,  # [V8.0] Groq 오픈소스
-        auto_refresh
+        auto_refresh,
+        stream_mode  # [V8.4] 업비트 WebSocket
+    )
+
+# -----------------------------------------------------------------------------
+# [V8.4] 실시간 시세 패널 (WebSocket 스트리밍, 패널만 부분 갱신)
+# -----------------------------------------------------------------------------
+@_live_fragment(run_every=2)
+def render_live_price_panel():
+    """업비트 보유 코인의 실시간 시세 (이 함수만 2초마다 다시 그려짐 - 전체 탭 재실행 없음)"""
+    upbit_holdings = [p for p in st.session_state.portfolio if p.get('exchange') == "Upbit"]
+    if not upbit_holdings:
+        st.caption("📡 실시간 스트리밍: 업비트 보유 코인이 없습니다.")
+        return
+
+    tickers = [p['ticker'] for p in upbit_holdings]
+    stream = get_upbit_stream()
+    stream.subscribe(st.session_state.session_id, tickers)
+    live = stream.quotes(tickers)
+
+    rows = []
+    for p in upbit_holdings:
+        q = live.get(p['ticker'].upper())
+        if not q:
+            continue
+        val = p['quantity'] * q['price']
+        cost = p['quantity'] * p['avg_price']
+        rows.append({
+            "코인": p['ticker'],
+            "현재가(₩)": q['price'],
+            "24H(%)": q['change_24h'],
+            "평가금액(₩)": val,
+            "수익률(%)": (val - cost) / cost * 100 if cost > 0 else 0,
+            "갱신": datetime.fromtimestamp(q['ts']).strftime("%H:%M:%S")
+        })
+
+    st.markdown("##### 📡 업비트 실시간 시세")
+    if rows:
+        st.dataframe(
+            pd.DataFrame(rows).style.format({"현재가(₩)": "₩{:,.0f}", "24H(%)": "{:+.2f}%", "평가금액(₩)": "₩{:,.0f}", "수익률(%)": "{:+.2f}%"}),
+            use_container_width=True, hide_index=True
+        )
+    else:
+        st.caption("⏳ 실시간 시세 수신 대기 중...")
+
+# -----------------------------------------------------------------------------
+# [V8.4] 김치 프리미엄 스캐너 패널 (30초마다 패널만 갱신)
+# -----------------------------------------------------------------------------
+@_live_fragment(run_every=30)
+def render_kimchi_scanner(rate):
+    scan = scan_kimchi_premiums(rate)
+    if scan.empty:
+        st.caption("김치 프리미엄 데이터를 불러올 수 없습니다.")
+        return
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("시장 중앙값", f"{scan['premium'].median():+.2f}%")
+    c2.metric("최고", f"{scan['ticker'].iloc[0]} {scan['premium'].iloc[0]:+.2f}%")
+    c3.metric("최저", f"{scan['ticker'].iloc[-1]} {scan['premium'].iloc[-1]:+.2f}%")
+
+    heat = scan[scan['market_cap'] > 0]
+    if not heat.empty:
+        fig = px.treemap(
+            heat, path=['ticker'], values='market_cap', color='premium',
+            color_continuous_scale='RdBu_r', color_continuous_midpoint=0,
+            hover_data={'premium': ':.2f', 'krw_price': ':,.0f', 'usd_price': ':,.4f'}
+        )
+        fig.update_layout(height=380, margin=dict(t=10, l=0, r=0, b=0))
+        st.plotly_chart(fig, use_container_width=True, key="kimchi_scan_heatmap")
+
+    st.dataframe(
+        scan.rename(columns={'ticker': '코인', 'krw_price': '업비트(₩)', 'usd_price': '해외($)', 'premium': '프리미엄(%)', 'market_cap': '시가총액($)', 'change_24h': '24H(%)'})
+            .style.format({'업비트(₩)': '₩{:,.2f}', '해외($)': '${:,.4f}', '프리미엄(%)': '{:+.2f}%', '시가총액($)': '${:,.0f}', '24H(%)': '{:+.2f}%'}),
+        use_container_width=True, hide_index=True, height=300
     )
+    st.caption(f"업비트 KRW {len(scan)}개 코인 · {datetime.now().strftime('%H:%M:%S')} 기준 (30초마다 갱신)")
 
 # -----------------------------------------------------------------------------
 # 탭 1: 대시보드
 # -----------------------------------------------------------------------------
-def render_dashboard_tab(gemini_key):
+def render_dashboard_tab(gemini_key, snapshot):
     st.markdown("### 📊 내 자산 & 시장 현황")
     
     # -------------------------------------------------------------------------
     # [V8.3] Sell Score Engine & Action Card
     # -------------------------------------------------------------------------
     # 1. 데이터 수집
-    mkt_v83 = get_market_data_v83()
+    mkt_v83 = snapshot.market_v83
     mvrv, is_auto = get_current_mvrv()
-    btc_df_wk = get_btc_ohlcv_weekly()
+    btc_df_wk = snapshot.btc_weekly
     
     rsi = 50
-    if btc_df_wk is not None and TA_AVAILABLE:
-        try:
-            rsi = RSIIndicator(btc_df_wk['Close'], 14).rsi().iloc[-1]
-        except: pass
+    if btc_df_wk is not None:
+        rsi = latest_indicator(btc_df_wk['Close'], "BTC", 'rsi', 50)
         
     # 2. Sell Score 계산
     score, reasons = calc_total_sell_score(mvrv, rsi, mkt_v83['fng'], mkt_v83['dom'], mkt_v83['dxy_chg'] > 0)
@@ -1749,16 +3676,16 @@ def render_dashboard_tab(gemini_key):
     # =========================================================================
     with st.expander("🌡️ 시장 심리 지표 (클릭하여 펼치기)", expanded=True):
         try:
-            fng = get_fear_greed_index()
-            global_data = get_btc_dominance()
-            alt_season = get_altcoin_season_index()
+            fng = snapshot.fng
+            global_data = snapshot.global_data
+            alt_season = snapshot.alt_season
             
             # API 응답이 딕셔너리인지 확인 (안전 처리)
-            if not isinstance(fng, dict):
+            if not isinstance(fng, (dict, MappingProxyType)):
                 fng = {'value': 50, 'classification': 'Neutral'}
-            if not isinstance(global_data, dict):
+            if not isinstance(global_data, (dict, MappingProxyType)):
                 global_data = {'btc_dominance': 0, 'eth_dominance': 0, 'total_market_cap': 0, 'market_cap_change_24h': 0}
-            if not isinstance(alt_season, dict):
+            if not isinstance(alt_season, (dict, MappingProxyType)):
                 alt_season = {'index': 50, 'is_alt_season': False, 'is_btc_season': False}
             
             col1, col2, col3, col4 = st.columns(4)
@@ -1836,11 +3763,15 @@ def render_dashboard_tab(gemini_key):
                 
                 st.markdown(f"""
                 <div style="text-align:center; padding:10px; background:linear-gradient(135deg, {alt_color}22, {alt_color}11); border-radius:10px; border:1px solid {alt_color}44;">
-                    <div style="font-size:0.8em; color:#64748b;">알트시즌 지수</div>
+                    <div style="font-size:0.8em; color:#64748b;">알트시즌 지수 ({alt_season.get('main_window', ALT_SEASON_MAIN_WINDOW)}일)</div>
                     <div style="font-size:2em; font-weight:bold; color:{alt_color};">{alt_idx:.0f}</div>
                     <div style="font-size:0.9em; color:{alt_color}; font-weight:600;">{alt_label}</div>
                 </div>
                 """, unsafe_allow_html=True)
+                windows = alt_season.get('windows') or {}
+                if windows:
+                    st.caption(" · ".join(f"{d}일 {v:.0f}" for d, v in sorted(windows.items())))
+                show_stale_notice(get_altcoin_season_index)
             
             # 4. 전체 시장
             with col4:
@@ -1868,6 +3799,16 @@ def render_dashboard_tab(gemini_key):
             # 해석 가이드 (데이터가 있을 때만)
             if fng_value > 0 and btc_dom > 0:
                 st.caption(f"💡 **해석**: 공포탐욕 {fng_value} {'(매수 기회 탐색)' if fng_value <= 30 else '(과열 주의)' if fng_value >= 70 else ''} | BTC 도미넌스 {btc_dom:.1f}% {'(자금 BTC 집중)' if btc_dom >= 55 else '(알트코인 강세)' if btc_dom <= 45 else ''} | 알트시즌 {alt_idx:.0f}/100 {'🎯' if is_alt else ''}")
+            
+            # [V8.4] 알트시즌 지수 추이 (일별 저장 이력 - 추가 요청 없음)
+            alt_hist = load_alt_season_history()
+            if len(alt_hist) >= 2:
+                alt_hist.columns = [f"{c}일" for c in alt_hist.columns]
+                fig_alt = px.line(alt_hist, x=alt_hist.index, y=alt_hist.columns, labels={'x': '', 'value': '알트시즌 지수', 'variable': '기간'})
+                fig_alt.add_hline(y=75, line_dash="dot", line_color="#8b5cf6")
+                fig_alt.add_hline(y=25, line_dash="dot", line_color="#f7931a")
+                fig_alt.update_layout(height=220, margin=dict(t=10, b=10), yaxis_range=[0, 100])
+                st.plotly_chart(fig_alt, use_container_width=True, key="alt_season_history")
         
         except Exception as e:
             st.warning(f"⚠️ 시장 심리 지표를 불러오는 중 오류가 발생했습니다. (대시보드는 정상 작동)")
@@ -1906,7 +3847,7 @@ def render_dashboard_tab(gemini_key):
             pass
     # --- [그래프 코드 끝] ---
     
-    rate = get_usd_krw_rate()
+    rate = snapshot.rate
     portfolio = st.session_state.portfolio
     
     if not portfolio: 
@@ -1920,7 +3861,7 @@ def render_dashboard_tab(gemini_key):
     csv_data = []  # [V7.9] CSV 내보내기용
     
     for p in portfolio:
-        cur_p, curr = get_market_price(p['ticker'], p.get('exchange', 'Binance'))
+        cur_p, curr = snapshot.price(p['ticker'], p.get('exchange', 'Binance'))
         k_rate = rate if curr == "USD" else 1
         val = p['quantity'] * cur_p * k_rate
         cost = p['quantity'] * p['avg_price'] * k_rate
@@ -1939,7 +3880,7 @@ def render_dashboard_tab(gemini_key):
         hit = (p['target_price'] > 0) and (cur_p >= p['target_price'])
         
         # [V7.9] 24시간 변동률 조회
-        change_24h = get_24h_change(p['ticker'], p.get('exchange', 'Binance'))
+        change_24h = snapshot.change(p['ticker'], p.get('exchange', 'Binance'))
         change_class = "change-positive" if change_24h > 0 else "change-negative" if change_24h < 0 else "change-neutral"
         
         table_data.append({
@@ -1969,9 +3910,7 @@ def render_dashboard_tab(gemini_key):
     pnl = total_krw - total_cost
     k2.metric("총 수익률", f"{pnl/total_cost*100:+.2f}%", f"₩{pnl:+,.0f}" if total_cost > 0 else "0")
     
-    btc_k = get_market_price("BTC", "Upbit")[0]
-    btc_u = get_market_price("BTC", "Binance")[0]
-    kimchi = ((btc_k / (btc_u * rate)) - 1) * 100 if btc_u > 0 else 0
+    kimchi = snapshot.kimchi_premium("BTC") or 0
     with k3:
         badge_class = "k-red" if kimchi > 3 else "k-blue" if kimchi > 0 else "k-green"
         st.markdown(f"**🌶️ 김치 프리미엄**: <span class='kimchi-badge {badge_class}'>{kimchi:+.2f}%</span>", unsafe_allow_html=True)
@@ -2040,8 +3979,13 @@ def render_dashboard_tab(gemini_key):
         with st.expander("🌶️ 코인별 김치 프리미엄 상세"):
             kimchi_rows = []
             coin_tickers = list(set([p['ticker'] for p in portfolio if "Stock" not in p.get('exchange', '')]))
-            for ticker in coin_tickers[:5]:  # 상위 5개만
-                premium = get_kimchi_premium(ticker, rate)
+            # [V8.4] 전체 시장 스캔 결과에서 보유 코인 전부 조회 (스캔에 없는 코인만 스냅샷 값 사용)
+            scan = scan_kimchi_premiums(snapshot.rate)
+            scanned = dict(zip(scan['ticker'], scan['premium']))
+            for ticker in coin_tickers:
+                premium = scanned.get(ticker.upper())
+                if premium is None:
+                    premium = snapshot.kimchi_premium(ticker)
                 if premium is not None:
                     badge = "🔴" if premium > 5 else "🟡" if premium > 2 else "🟢" if premium > 0 else "🔵"
                     kimchi_rows.append(f"{badge} **{ticker}**: {premium:+.2f}%")
@@ -2051,18 +3995,33 @@ def render_dashboard_tab(gemini_key):
             else:
                 st.caption("김치 프리미엄 데이터를 불러올 수 없습니다.")
 
+    with st.expander("🌶️ 전체 시장 김치 프리미엄 스캐너 (업비트 KRW 전 종목)"):
+        render_kimchi_scanner(snapshot.rate)
+
     st.divider()
     st.markdown("### 🧠 코인 인텔리전스 (AI & Data)")
+    coin_tickers = list(set([p['ticker'] for p in portfolio if "Stock" not in p.get('exchange', '')]))
     selected = st.selectbox("분석할 코인", list(set([p['ticker'] for p in portfolio])))
     
+    # [V8.4] 보유 코인 일봉을 한 번에 받아두면 코인을 바꿔 선택해도 추가 다운로드 없음
+    prefetch_daily_candles(coin_tickers, DAILY_BASE_DAYS)
+    # [V8.4] 보유 코인 전체의 주봉 지표를 한 번에 계산 → 선택 코인은 테이블에서 조회
+    indicators = compute_indicators(close_matrix(coin_tickers, "1wk", 60))
+    latest_ind = indicators.latest()
+    if len(latest_ind) > 1:
+        with st.expander("📋 보유 코인 기술적 지표 요약 (주봉)"):
+            summary_df = latest_ind[['close', 'rsi', 'macd_hist', 'bb_pct']].join(score_technical(latest_ind))
+            summary_df = summary_df.sort_values('score', ascending=False)
+            st.dataframe(summary_df.rename(columns={'close': '종가($)', 'rsi': 'RSI', 'macd_hist': 'MACD 히스토그램', 'bb_pct': '볼린저 %B', 'score': '점수', 'signal': '시그널'}).style.format({'종가($)': '{:,.4g}', 'RSI': '{:.1f}', 'MACD 히스토그램': '{:+.4g}', '볼린저 %B': '{:.2f}'}, na_rep='-'), use_container_width=True)
+    
     if selected:
         with st.spinner(f'{selected} 데이터 및 뉴스 로딩 중...'):
             info = get_coingecko_details(selected, gemini_key)
             w_df = get_weekly_ohlcv(selected, 60)
             news = get_translated_news([selected, f"{selected} coin"], gemini_key)
-            rate = get_usd_krw_rate()
             
             if info and w_df is not None:
+                show_stale_notice(get_daily_candles, selected, DAILY_BASE_DAYS)
                 col_info, col_tech, col_news = st.columns([1.2, 1, 1])
                 
                 with col_info:
@@ -2095,11 +4054,14 @@ def render_dashboard_tab(gemini_key):
 
                 with col_tech:
                     st.markdown("#### 📊 기술적 전망")
-                    outlook = analyze_technical(w_df)
+                    outlook = analyze_technical(latest_ind, selected)
                     color = "green" if "매수" in outlook['signal'] else "red" if "매도" in outlook['signal'] else "gray"
                     st.markdown(f"##### 시그널: <span style='color:{color}'>{outlook['signal']}</span>", unsafe_allow_html=True)
                     
-                    rsi = RSIIndicator(w_df['c'], 14).rsi().tail(12)
+                    if selected in indicators.symbols:
+                        rsi = indicators.series('rsi', selected).dropna().tail(12)
+                    else:
+                        rsi = compute_indicators(w_df[['c']].rename(columns={'c': selected})).series('rsi', selected).dropna().tail(12)
                     fig = go.Figure(go.Scatter(x=rsi.index, y=rsi.values, mode='lines+markers', line=dict(color='#6366f1')))
                     fig.add_hline(y=70, line_dash="dot", line_color="red"); fig.add_hline(y=30, line_dash="dot", line_color="green")
                     st.plotly_chart(fig.update_layout(height=100, margin=dict(l=0,r=0,t=0,b=0), yaxis=dict(showgrid=False), xaxis=dict(showgrid=False)), use_container_width=True, key=f"rsi_sparkline_{selected}")
@@ -2136,16 +4098,38 @@ def render_dashboard_tab(gemini_key):
 # -----------------------------------------------------------------------------
 # 탭 2: 사이클 & 매크로
 # -----------------------------------------------------------------------------
-def render_macro_tab(fred_key):
+def render_macro_tab(fred_key, snapshot):
     st.markdown("### 🔮 시장 매크로 & 사이클")
     
     # DXY
-    dxy_val, dxy_chg = get_dxy_index()
+    dxy = get_dxy_view()
+    dxy_val, dxy_chg = dxy.value, dxy.change_pct
+    # [V8.4] FRED 지표는 오래된 시리즈만 증분 수집하고 화면은 로컬 저장소에서 읽음
+    try:
+        sync_macro_series(fred_key)
+    except: pass
     c0, c_dum = st.columns([1, 3])
     with c0:
         st.markdown("#### 💵 달러 인덱스 (DXY)")
         st.metric("DXY", f"{dxy_val:.2f}", f"{dxy_chg:+.2f}%", delta_color="inverse")
         st.caption("달러 가치가 오르면 비트코인은 주로 하락합니다.")
+    with c_dum:
+        st.markdown("#### 🏦 FRED 매크로 지표")
+        fed = get_macro_series("fed_funds")
+        m2 = get_macro_series("m2")
+        cpi = get_macro_series("cpi")
+        if fed.empty and m2.empty and cpi.empty:
+            st.caption("FRED API 키를 입력하면 기준금리 / M2 / CPI를 표시합니다.")
+        else:
+            f1, f2, f3 = st.columns(3)
+            if not fed.empty:
+                f1.metric("미국 기준금리", f"{fed.iloc[-1]:.2f}%", f"{fed.iloc[-1] - fed.iloc[-2]:+.2f}%p" if len(fed) > 1 else None, delta_color="inverse")
+            if len(m2) > 12:
+                f2.metric("M2 통화량 (YoY)", f"{(m2.iloc[-1] / m2.iloc[-13] - 1) * 100:+.1f}%")
+            if len(cpi) > 12:
+                f3.metric("CPI 물가 (YoY)", f"{(cpi.iloc[-1] / cpi.iloc[-13] - 1) * 100:+.1f}%", delta_color="inverse")
+            latest = max((s.index[-1] for s in (fed, m2, cpi) if not s.empty))
+            st.caption(f"최근 관측: {latest.strftime('%Y-%m')} · 로컬 저장 데이터 (6시간마다 새 관측치만 수집)")
     
     st.divider()
     
@@ -2160,8 +4144,9 @@ def render_macro_tab(fred_key):
     
     btc_df = get_daily_ohlcv("BTC", 1000)
     if btc_df is not None and len(btc_df) > 350:
-        ma111 = SMAIndicator(btc_df['c'], 111).sma_indicator()
-        ma350x2 = SMAIndicator(btc_df['c'], 350).sma_indicator() * 2
+        closes = btc_df[['c']].to_numpy(dtype='float64')
+        ma111 = _sma(closes, 111)[:, 0]
+        ma350x2 = _sma(closes, 350)[:, 0] * 2
         fig = go.Figure()
         fig.add_trace(go.Scatter(x=btc_df.index, y=btc_df['c'], name='Price', line=dict(color='gray', width=1)))
         fig.add_trace(go.Scatter(x=btc_df.index, y=ma111, name='111 DMA', line=dict(color='orange', width=2)))
@@ -2174,17 +4159,22 @@ def render_macro_tab(fred_key):
     c1, c2 = st.columns(2)
     with c1:
         st.markdown("#### 😨 공포 & 탐욕 지수")
-        fng = get_fear_greed()
+        fng = snapshot.fng.get('value', 50)
         fig = go.Figure(go.Indicator(mode="gauge+number", value=fng, 
             gauge={'axis': {'range': [0, 100]}, 'steps': [{'range': [0, 25], 'color': "#ef4444"}, {'range': [75, 100], 'color': "#22c55e"}]}))
         st.plotly_chart(fig.update_layout(height=250), use_container_width=True, key="fng_gauge_macro")
+        # [V8.4] 최근 30일 추이 (같은 FnG 응답 재사용)
+        if snapshot.fng_history:
+            fng_dates, fng_values = zip(*snapshot.fng_history)
+            fig_hist = go.Figure(go.Scatter(x=fng_dates, y=fng_values, mode='lines', line=dict(color='#f97316')))
+            st.plotly_chart(fig_hist.update_layout(height=120, margin=dict(l=0, r=0, t=0, b=0), yaxis=dict(range=[0, 100])), use_container_width=True, key="fng_history_macro")
         with st.expander("지표 해석"):
             st.markdown("- **0~25 (Extreme Fear)**: <span style='color:red'>매수 기회</span> (공포에 사라)", unsafe_allow_html=True)
             st.markdown("- **75~100 (Extreme Greed)**: <span style='color:green'>매도 고려</span> (탐욕에 팜아라)", unsafe_allow_html=True)
             
     with c2:
         st.markdown("#### 🚀 알트코인 시즌 지수")
-        dom = get_btc_dominance()
+        dom = snapshot.global_data.get('btc_dominance', 0) or 58.0
         st.metric("BTC Dominance", f"{dom:.1f}%")
         st.progress(min(dom/100, 1.0))
         if dom < 40: st.success("🎉 알트코인 시즌 (매수 기회)")
@@ -2218,11 +4208,8 @@ def render_macro_tab(fred_key):
     with c5:
         st.markdown("#### 🏭 ISM 제조업 지수")
         ism = st.session_state.manual_data['ism_pmi']
-        if fred_key and FRED_AVAILABLE:
-            try:
-                data = Fred(api_key=fred_key).get_series('ISM/MAN_MANUFACTURING')
-                if not data.empty: ism = data.iloc[-1]
-            except: pass
+        ism_series = get_macro_series("ism")
+        if not ism_series.empty: ism = float(ism_series.iloc[-1])
         st.metric("Index", f"{ism:.1f}")
         st.progress(min(ism/100, 1.0))
         if ism < 50: st.caption("📉 경기 침체 가능성")
@@ -2233,7 +4220,7 @@ def render_macro_tab(fred_key):
 # -----------------------------------------------------------------------------
 # 탭 3: 심층 분석 (V7.6 안정성 강화)
 # -----------------------------------------------------------------------------
-def render_deep_tab():
+def render_deep_tab(snapshot):
     # 1. 고래 추적 섹션
     st.markdown("### 🔎 심층 분석 (실시간 체결 고래 포착)")
     st.caption("대량 체결 내역을 추적합니다. (한국에서는 업비트 데이터 사용)")
@@ -2243,10 +4230,10 @@ def render_deep_tab():
     # 방법 1: 업비트 API 시도 (한국 거래소 - 지역 제한 없음)
     try:
         url = "https://api.upbit.com/v1/trades/ticks?market=KRW-BTC&count=100"
-        res = requests.get(url, timeout=5)
+        res = http_get(url, timeout=5)
         if res.status_code == 200:
             trades = res.json()
-            rate = get_usd_krw_rate()
+            rate = snapshot.rate
             # 5천만원(약 $35,000) 이상 대량 체결
             large = [t for t in trades if t['trade_price'] * t['trade_volume'] > 50000000]
             
@@ -2279,7 +4266,7 @@ def render_deep_tab():
     # 방법 2: OKX 시도 (한국 접근 가능)
     if not whale_data_loaded and CCXT_AVAILABLE:
         try:
-            exchange = ccxt.okx({'timeout': 10000, 'enableRateLimit': True})
+            exchange = get_exchange("okx")
             trades = exchange.fetch_trades('BTC/USDT', limit=100)
             large = [t for t in trades if (t['price'] * t['amount']) > 50000]
             
@@ -2334,28 +4321,14 @@ def render_deep_tab():
         end = datetime.now()
         start = end - timedelta(days=365)
         
-        btc = yf.download("BTC-USD", start=start, end=end, progress=False)
-        nasdaq = yf.download("^IXIC", start=start, end=end, progress=False)
+        # 로컬 히스토리에서 읽음 (없거나 오래된 경우에만 부족한 구간 수집)
+        ensure_history(["BTC-USD", "^IXIC"], start)
+        df_corr = history_frame(["BTC-USD", "^IXIC"], start=start, end=end)
 
-        if btc.empty or nasdaq.empty:
+        if set(df_corr.columns) != {"BTC-USD", "^IXIC"}:
             raise ValueError("데이터를 불러올 수 없습니다. (Yahoo Finance 응답 없음)")
 
-        # 멀티인덱스 컬럼 처리
-        if isinstance(btc.columns, pd.MultiIndex):
-            btc = btc['Close'].iloc[:, 0] if len(btc['Close'].shape) > 1 else btc['Close']
-        else:
-            btc = btc['Close']
-            
-        if isinstance(nasdaq.columns, pd.MultiIndex):
-            nasdaq = nasdaq['Close'].iloc[:, 0] if len(nasdaq['Close'].shape) > 1 else nasdaq['Close']
-        else:
-            nasdaq = nasdaq['Close']
-
-        # 타임존 제거 및 결합
-        btc.index = btc.index.tz_localize(None)
-        nasdaq.index = nasdaq.index.tz_localize(None)
-        
-        df_corr = pd.concat([btc, nasdaq], axis=1).dropna()
+        df_corr = df_corr[["BTC-USD", "^IXIC"]].dropna()
         df_corr.columns = ['BTC', 'NASDAQ']
         
         corr = df_corr['BTC'].corr(df_corr['NASDAQ'])
@@ -2390,7 +4363,7 @@ def render_deep_tab():
 # -----------------------------------------------------------------------------
 # 탭 4: 뉴스 & 알림
 # -----------------------------------------------------------------------------
-def render_news_tab(gemini_key):
+def render_news_tab(gemini_key, snapshot):
     st.markdown("### 📰 코인 전문 뉴스룸")
     st.caption("📰 블록미디어 | 🪙 토큰포스트 | 🌐 CoinDesk | 📡 CoinTelegraph | 🧱 The Block")
     
@@ -2489,10 +4462,7 @@ def render_news_tab(gemini_key):
             
         # 김치 프리미엄 알림
         try:
-            rate = get_usd_krw_rate()
-            btc_k = get_market_price("BTC", "Upbit")[0]
-            btc_u = get_market_price("BTC", "Binance")[0]
-            kimchi = ((btc_k / (btc_u * rate)) - 1) * 100 if btc_u > 0 else 0
+            kimchi = snapshot.kimchi_premium("BTC") or 0
             if kimchi > 5:
                 signals.append((f"🌶️ 김치 프리미엄 과열 ({kimchi:.1f}%)", "error"))
             elif kimchi < -2:
@@ -2584,25 +4554,18 @@ def render_tools_tab():
                     ticker_symbol = f"{coin_input}-USD"
                     
                     with st.spinner(f"{coin_input} 데이터 조회 중..."):
-                        df = yf.download(ticker_symbol, start=date, end=date + timedelta(days=7), progress=False)
+                        # 로컬 히스토리 사용 (매수일부터 오늘까지 한 번 받아두면 이후 계산은 다운로드 없음)
+                        ensure_history([ticker_symbol], date)
+                        hist = read_history(ticker_symbol, start=date)
                         
-                        if df.empty:
+                        if hist is None or not len(hist.ts) or hist.ts[0] > _epoch_ms(date + timedelta(days=7)):
                             st.error(f"❌ '{coin_input}' 데이터를 찾을 수 없습니다. 티커를 확인해주세요.")
                             st.caption("예: Bitcoin → BTC, Ethereum → ETH, Solana → SOL")
                             return
                         
-                        # 멀티인덱스 처리
-                        if isinstance(df.columns, pd.MultiIndex):
-                            past = float(df['Close'].iloc[0, 0])
-                        else:
-                            past = float(df['Close'].iloc[0])
-                        
-                        curr_df = yf.Ticker(ticker_symbol).history(period="1d")
-                        if curr_df.empty:
-                            st.error("현재 가격을 불러올 수 없습니다.")
-                            return
-                            
-                        curr = float(curr_df['Close'].iloc[-1])
+                        closes = hist.column('c')
+                        past = float(closes[0])
+                        curr = float(closes[-1])
                         
                         # 수익 계산
                         coins_bought = amt / past
@@ -2633,7 +4596,7 @@ def render_tools_tab():
                     # 업비트 일봉 API
                     date_str = date.strftime("%Y-%m-%dT09:00:00")
                     url = f"https://api.upbit.com/v1/candles/days?market=KRW-{coin_input}&to={date_str}&count=1"
-                    res = requests.get(url, timeout=5)
+                    res = http_get(url, timeout=5)
                     
                     if res.status_code != 200 or not res.json():
                         st.error(f"❌ 업비트에서 '{coin_input}' 데이터를 찾을 수 없습니다.")
@@ -2645,7 +4608,7 @@ def render_tools_tab():
                     
                     # 현재가 조회
                     curr_url = f"https://api.upbit.com/v1/ticker?markets=KRW-{coin_input}"
-                    curr_res = requests.get(curr_url, timeout=3)
+                    curr_res = http_get(curr_url, timeout=3)
                     
                     if curr_res.status_code != 200 or not curr_res.json():
                         st.error("현재 가격을 불러올 수 없습니다.")
@@ -2697,7 +4660,7 @@ def render_tools_tab():
 # -----------------------------------------------------------------------------
 # 탭: AI 투자 위원회 (V8.1 - Groq 오픈소스 모델 + 히스토리)
 # -----------------------------------------------------------------------------
-def render_ai_council_tab(gemini_key, openai_key, claude_key, grok_key, groq_key):
+def render_ai_council_tab(gemini_key, openai_key, claude_key, grok_key, groq_key, snapshot):
     st.markdown("### 🤖 AI 투자 위원회 V8.1 (다중 모델 Cross-Check)")
     st.caption("다양한 AI 모델들이 각자의 페르소나로 시장을 분석하고 투표합니다. Groq 무료 API로 오픈소스 모델 사용 가능!")
 
@@ -2715,8 +4678,7 @@ def render_ai_council_tab(gemini_key, openai_key, claude_key, grok_key, groq_key
     
     # 프롬프트 데이터 준비
     info = get_coingecko_details(target_coin, gemini_key)
-    rate = get_usd_krw_rate()
-    cur_price, _ = get_market_price(target_coin, 'Binance')
+    cur_price, _ = snapshot.price(target_coin, 'Binance')
     price_info = f"현재가: ${cur_price:,.2f}, 시총순위: {info.get('rank', '-')}위"
     
     context_prompt = f"""
@@ -3014,7 +4976,7 @@ def render_ai_council_tab(gemini_key, openai_key, claude_key, grok_key, groq_key
 # -----------------------------------------------------------------------------
 # 탭: 매도 전략 (Smart Exit Planner) - V7.3 Macro & Tech
 # -----------------------------------------------------------------------------
-def render_exit_strategy_tab():
+def render_exit_strategy_tab(snapshot):
     st.markdown("### 📉 종합 매도 타이밍 (Macro & Tech)")
     st.caption("기술적 지표뿐만 아니라 **거시적 이벤트(재료)**를 종합하여 최적의 매도 시점을 판단합니다.")
 
@@ -3059,16 +5021,17 @@ def render_exit_strategy_tab():
     
     # 기술적 점수 계산 (BTC 기준)
     w_df = get_weekly_ohlcv("BTC", 60)
+    show_stale_notice(get_daily_candles, "BTC", DAILY_BASE_DAYS)
     mvrv = st.session_state.manual_data['mvrv_zscore']
-    fng = get_fear_greed()
+    fng = snapshot.fng.get('value', 50)
     
     tech_score = 0
     tech_reasons = []
     
     # RSI 점수 (0~40점)
     rsi = 50
-    if w_df is not None and TA_AVAILABLE:
-        rsi = RSIIndicator(w_df['c'], 14).rsi().iloc[-1]
+    if w_df is not None:
+        rsi = latest_indicator(w_df['c'], "BTC", 'rsi', 50)
         if rsi >= 80: tech_score += 40; tech_reasons.append(f"🔥 주봉 RSI {rsi:.0f} (초과열)")
         elif rsi >= 70: tech_score += 30; tech_reasons.append(f"🔥 주봉 RSI {rsi:.0f} (과열)")
         elif rsi >= 60: tech_score += 10
@@ -3137,8 +5100,8 @@ def render_exit_strategy_tab():
     current_qty = target_asset['quantity']
     avg_price = target_asset['avg_price']
     
-    cur_price, currency = get_market_price(selected_coin, target_asset.get('exchange', 'Binance'))
-    rate = get_usd_krw_rate()
+    cur_price, currency = snapshot.price(selected_coin, target_asset.get('exchange', 'Binance'))
+    rate = snapshot.rate
     k_rate = rate if currency == "USD" else 1
     
     c_set1, c_set2 = st.columns([1, 2])
@@ -3222,6 +5185,7 @@ def render_hedge_tab():
     norm_df, corr_data = get_hedge_data(user_stocks=my_stocks)
     
     if norm_df is not None and corr_data is not None:
+        show_stale_notice(get_hedge_data, user_stocks=my_stocks)
         st.markdown("#### 📉 최근 6개월 수익률 비교")
         st.plotly_chart(px.line(norm_df, x=norm_df.index, y=norm_df.columns).update_layout(height=350, hovermode="x unified"), use_container_width=True, key="hedge_return_line")
         
@@ -3254,7 +5218,7 @@ def render_hedge_tab():
 # -----------------------------------------------------------------------------
 # 탭 6: 리밸런싱 전략 (V7.1 개선)
 # -----------------------------------------------------------------------------
-def render_rebalance_tab():
+def render_rebalance_tab(snapshot):
     st.markdown("### ⚖️ 포트폴리오 리밸런싱 (Rebalancing)")
     st.caption("설정한 목표 비중에 맞춰 자산을 매수/매도하여 포트폴리오 균형을 맞춥니다.")
 
@@ -3264,16 +5228,16 @@ def render_rebalance_tab():
         return
 
     data_list = []
-    rate = get_usd_krw_rate()
+    rate = snapshot.rate
     total_value_krw = 0
 
-    # 현재 가치 계산
+    # 현재 가치 계산 ([V8.4] 스냅샷 시세 사용)
     for p in st.session_state.portfolio:
         ticker = p['ticker']
         qty = p['quantity']
         exchange = p.get('exchange', 'Binance')
         
-        cur_p, curr = get_market_price(ticker, exchange)
+        cur_p, curr = snapshot.price(ticker, exchange)
         k_rate = rate if curr == "USD" else 1
         val_krw = qty * cur_p * k_rate
         total_value_krw += val_krw
@@ -3417,31 +5381,38 @@ def main():
         render_mobile_login()
         return  # 로그인 전에는 대시보드를 표시하지 않음
     
-    gemini_key, openai_key, claude_key, grok_key, groq_key, auto = render_sidebar()
+    # [V8.4] 공용 서비스가 갱신해 둔 시세/환율/시장 지표를 모든 탭이 공유 (메모리 읽기)
+    snapshot = get_market_service().snapshot_for(st.session_state.username, st.session_state.portfolio)
+    
+    gemini_key, openai_key, claude_key, grok_key, groq_key, auto, stream = render_sidebar(snapshot)
     st.markdown("<h1 style='text-align: center; color: #3b82f6;'>🐋 크립토 인사이트 V8.1</h1>", unsafe_allow_html=True)
     
+    # [V8.4] 스트리밍 모드: 시세 패널만 부분 갱신
+    if stream:
+        render_live_price_panel()
+    
     tabs = st.tabs(["📊 대시보드", "🔮 사이클/매크로", "🛡️ 헤지", "⚖️ 리밸런싱", "📉 매도 전략", "🤖 AI 위원회", "🔎 심층 분석", "📰 뉴스", "🧮 도구"])
     
-    # FRED key는 세션에서 가져오거나 gemini_key 사용
-    fred_key = st.session_state.get("fred_key", gemini_key)
+    # FRED key는 사용자가 입력한 키만 사용 (다른 서비스 키를 FRED로 보내지 않음)
+    fred_key = st.session_state.fred_key
     
-    with tabs[0]: render_dashboard_tab(gemini_key)
-    with tabs[1]: render_macro_tab(fred_key)
+    with tabs[0]: render_dashboard_tab(gemini_key, snapshot)
+    with tabs[1]: render_macro_tab(fred_key, snapshot)
     with tabs[2]: render_hedge_tab()
-    with tabs[3]: render_rebalance_tab()
-    with tabs[4]: render_exit_strategy_tab()
-    with tabs[5]: render_ai_council_tab(gemini_key, openai_key, claude_key, grok_key, groq_key)
-    with tabs[6]: render_deep_tab()
-    with tabs[7]: render_news_tab(gemini_key)
+    with tabs[3]: render_rebalance_tab(snapshot)
+    with tabs[4]: render_exit_strategy_tab(snapshot)
+    with tabs[5]: render_ai_council_tab(gemini_key, openai_key, claude_key, grok_key, groq_key, snapshot)
+    with tabs[6]: render_deep_tab(snapshot)
+    with tabs[7]: render_news_tab(gemini_key, snapshot)
     with tabs[8]: render_tools_tab()
     
-    # [V7.1] 텔레그램 알림 체크 (실시간 갱신 활성화 시)
-    if auto and st.session_state.telegram.get('enabled'):
-        rate = get_usd_krw_rate()
+    # [V7.1] 텔레그램 알림 체크 (실시간 갱신/스트리밍 활성화 시)
+    if (auto or stream) and st.session_state.telegram.get('enabled'):
         mvrv = st.session_state.manual_data.get('mvrv_zscore', 0)
-        check_and_send_alerts(st.session_state.portfolio, rate, mvrv)
+        check_and_send_alerts(st.session_state.portfolio, snapshot, mvrv)
     
-    if auto: time.sleep(10); st.rerun()
+    # 스트리밍 모드에서는 전체 재실행 없이 실시간 패널만 갱신
+    if auto and not stream: time.sleep(10); st.rerun()
 
 # [V7.9] 모바일 친화적 로그인 화면
 def render_mobile_login():
@@ -3500,6 +5471,7 @@ def render_mobile_login():
                         st.session_state.claude_key = api_keys.get("claude", "")
                         st.session_state.grok_key = api_keys.get("grok", "")
                         st.session_state.groq_key = api_keys.get("groq", "")  # [V8.0] Groq 오픈소스
+                        st.session_state.fred_key = api_keys.get("fred", "")  # [V8.4] FRED 매크로 지표
                         st.session_state.telegram_id = saved_data.get("telegram_id", "")
                         
                         # 텔레그램 봇 토큰